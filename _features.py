@@ -0,0 +1,27 @@
+"""Helpers for rewriting the ``features``/``track_features`` fields of a record."""
+
+
+def _extract_and_remove_vc_feature(record):
+    features = record.get("features", "").split()
+    vc_features = tuple(f for f in features if f.startswith("vc"))
+    if not vc_features:
+        return None
+    non_vc_features = tuple(f for f in features if f not in vc_features)
+    vc_version = int(vc_features[0][2:])  # throw away all but the first
+    if non_vc_features:
+        record["features"] = " ".join(non_vc_features)
+    else:
+        del record["features"]
+    return vc_version
+
+
+def _extract_feature(record, feature_name):
+    features = record.get("features", "").split()
+    features.remove(feature_name)
+    return " ".join(features)
+
+
+def _extract_track_feature(record, feature_name):
+    features = record.get("track_features", "").split()
+    features.remove(feature_name)
+    return " ".join(features)
@@ -0,0 +1,68 @@
+"""Helpers for reading and writing repodata and patch instructions as JSON."""
+
+import json
+import os
+
+import requests
+
+try:
+    import orjson
+except ImportError:  # optional, only speeds up reading and writing repodata
+    orjson = None
+
+
+def _loads_json(data):
+    # pass the raw bytes, orjson parses them without decoding to str first
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _read_json(path):
+    with open(path, "rb") as fh:
+        return _loads_json(fh.read())
+
+
+def _write_json(path, data):
+    if orjson is not None:
+        content = orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_SORT_KEYS)
+    else:
+        content = json.dumps(data, indent=2, sort_keys=True, separators=(",", ": ")).encode()
+    # reruns usually produce the same patch instructions as before, don't
+    # rewrite (and fsync) a file that already has this content
+    try:
+        with open(path, "rb") as fh:
+            if fh.read() == content:
+                return
+    except FileNotFoundError:
+        pass
+    _write_bytes(path, content)
+
+
+def _write_bytes(path, content):
+    # write to a sibling temp file and swap it in, so readers never see a
+    # partially written file
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as fh:
+        fh.write(content)
+        fh.flush()
+        os.fsync(fh.fileno())
+    os.replace(tmp_path, path)
+
+
+def _read_or_fetch_bytes(path, url, session=requests):
+    # read the local copy, or download it and keep the downloaded bytes as
+    # they are, rather than parsing and dumping them again
+    if os.path.isfile(path):
+        with open(path, "rb") as fh:
+            return fh.read()
+    response = session.get(url)
+    response.raise_for_status()
+    # other subdirs may be creating the same directories at the same time
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    _write_bytes(path, response.content)
+    return response.content
+
+
+def _read_or_fetch_json(path, url, session=requests):
+    return _loads_json(_read_or_fetch_bytes(path, url, session))
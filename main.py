@@ -1,16 +1,23 @@
 import bisect
-import copy
 import fnmatch
+import functools
+import hashlib
 import json
 import os
-from os.path import dirname, isdir, isfile, join
+from os.path import dirname, isfile, join
 import re
 import sys
 from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
+import conda
 from conda.models.version import VersionOrder
-import requests
+
+import _features
+import _repodata_io
+from _features import _extract_and_remove_vc_feature, _extract_track_feature
+from _repodata_io import _loads_json, _read_or_fetch_bytes, _write_bytes, _write_json
 
 CHANNEL_NAME = "main"
 CHANNEL_ALIAS = "https://repo.anaconda.com/pkgs"
@@ -30,7 +37,7 @@ SUBDIRS = (
 )
 
 REMOVALS = {
-    "noarch": (),
+    "noarch": [],
     "linux-ppc64le": [
         # This build contains incorrect libffi run depends; removing rather
         # than patching to prevent solver from getting stuck in a bistable
@@ -73,7 +80,7 @@ REMOVALS = {
         "cffi-1.14.6-py38h7f8727e_0.tar.bz2",
         "cffi-1.14.6-py39h7f8727e_0.tar.bz2",
     ],
-    "any": {
+    "any": [
         # early efforts on splitting numpy recipe did not pin numpy-base exactly.
         #     These led to bad builds (built against newest numpy)
         "numpy-*1.11.3-*_6.tar.bz2",
@@ -102,8 +109,8 @@ REMOVALS = {
         # anaconda-client<1.10.0 is incompatible with python 3.10
         "anaconda-client-1.9.0-py310*",
         # navigator-updater=0.5.0 is incompatible with anaconda-navigator
-        "navigator-updater-0.5.0-*"
-    },
+        "navigator-updater-0.5.0-*",
+    ],
 }
 
 REVOKED = {
@@ -234,14 +241,14 @@ NP_BASE_LOOSE_PIN = {
     "osx-arm64": [],
 }
 
-BLAS_USING_PKGS = {
+BLAS_USING_PKGS = frozenset((
     "numpy",
     "numpy-base",
     "scipy",
     "numexpr",
     "scikit-learn",
     "libmxnet",
-}
+))
 
 TFLOW_SUBS = {
     # 1.8.0, eigen is the default variant
@@ -264,15 +271,47 @@ CUDATK_SUBS = {
     "cudatoolkit >=9.2,<10.0a0": "cudatoolkit >=9.2,<9.3.0a0",
     "cudatoolkit >=10.0.130,<11.0a0": "cudatoolkit >=10.0.130,<10.1.0a0",
 }
+
+# cudnn depends that are rewritten regardless of the cudatoolkit version
+CUDNN_7_SUBS = {
+    "cudnn 7.0": "cudnn >=7.0.0,<=8.0a0",
+    "cudnn 7.1.*": "cudnn >=7.1.0,<=8.0a0",
+    "cudnn 7.2.*": "cudnn >=7.2.0,<=8.0a0",
+}
+# Prior to 2019-01-24 all packages were build against:
+# cudatoolkit 8.0 : cudnn 7.0.5
+# cudatoolkit 9.0 : cudnn 7.1.2
+# cudatoolkit 9.2 : cudnn 7.2.1
+CUDNN_7_STAR_SUBS = {
+    "cudatoolkit 8.0": "cudnn >=7.0.5,<=8.0a0",
+    "cudatoolkit 9.0": "cudnn >=7.1.2,<=8.0a0",
+    "cudatoolkit 9.2": "cudnn >=7.2.1,<=8.0a0",
+}
+
 MKL_VERSION_2018_RE = re.compile(r">=2018(.\d){0,2}$")
 MKL_VERSION_2018_EXTENDED_RC = re.compile(r">=2018(.\d){0,2}")
-LINUX_RUNTIME_RE = re.compile(r"lib(\w+)-ng\s(?:>=)?([\d\.]+\d)(?:$|\.\*)")
 LINUX_RUNTIME_DEPS = ("libgcc-ng", "libstdcxx-ng", "libgfortran-ng")
+# only matches the LINUX_RUNTIME_DEPS packages
+LINUX_RUNTIME_RE = re.compile(r"lib(gcc|stdcxx|gfortran)-ng\s(?:>=)?([\d\.]+\d)(?:$|\.\*)")
 
 # Packages that do *not* need to have their libffi dependencies patched
-LIBFFI_HOTFIX_EXCLUDES = [
+LIBFFI_HOTFIX_EXCLUDES = frozenset((
     "_anaconda_depends",
-]
+))
+
+# record keys that patch_record diffs and writes to the patch instructions
+PATCHED_KEYS = (
+    "app_entry",
+    "app_type",
+    "constrains",
+    "depends",
+    "features",
+    "namespace",
+    "license_family",
+    "subdir",
+    "track_features",
+    "type",
+)
 
 # Get the directory where the current script is located
 script_directory = Path(__file__).parent
@@ -282,6 +321,12 @@ json_file_path = script_directory / "numpy2_patch.json"
 
 # Read and load the JSON file
 NUMPY_2_CHANGES = json.loads(json_file_path.read_text())
+# the same changes keyed on (subdir, filename) for a single lookup per record
+_NUMPY_2_CHANGES_BY_FILE = {
+    (subdir, filename): change
+    for subdir, changes in NUMPY_2_CHANGES.items()
+    for filename, change in changes.items()
+}
 
 
 def apply_numpy2_changes(record, subdir, filename):
@@ -292,48 +337,48 @@ def apply_numpy2_changes(record, subdir, filename):
     - subdir: The subdirectory of the record.
     - filename: The filename of the record.
     """
-    if subdir not in NUMPY_2_CHANGES:
-        return
-
-    change = NUMPY_2_CHANGES[subdir].get(filename)
+    change = _NUMPY_2_CHANGES_BY_FILE.get((subdir, filename))
     if change:
         replace_dep(record[change["type"]], change["original"], change["updated"])
 
 
+PYTHON_VC_DEPS = {
+    "2.6": "vc 9.*",
+    "2.7": "vc 9.*",
+    "3.3": "vc 10.*",
+    "3.4": "vc 10.*",
+    "3.5": "vc 14.*",
+    "3.6": "vc 14.*",
+    "3.7": "vc 14.*",
+}
+
+VS_RUNTIME_DEPS = {
+    9: "vs2008_runtime",
+    10: "vs2010_runtime",
+    14: "vs2015_runtime",
+}
+
+
 def _replace_vc_features_with_vc_pkg_deps(name, record, depends):
-    python_vc_deps = {
-        "2.6": "vc 9.*",
-        "2.7": "vc 9.*",
-        "3.3": "vc 10.*",
-        "3.4": "vc 10.*",
-        "3.5": "vc 14.*",
-        "3.6": "vc 14.*",
-        "3.7": "vc 14.*",
-    }
-    vs_runtime_deps = {
-        9: "vs2008_runtime",
-        10: "vs2010_runtime",
-        14: "vs2015_runtime",
-    }
     if name == "python":
         # remove the track_features key
         if "track_features" in record:
             record["track_features"] = ""
         # add a vc dependency
         if not any(d.startswith("vc") for d in depends):
-            depends.append(python_vc_deps[record["version"][:3]])
+            depends.append(PYTHON_VC_DEPS[record["version"][:3]])
     elif name == "vs2015_win-64":
         # remove the track_features key
         if "track_features" in record:
             record["track_features"] = ""
-    elif record["name"] == "yasm":
+    elif name == "yasm":
         # remove vc from the features key
         vc_version = _extract_and_remove_vc_feature(record)
         if vc_version:
             record["features"] = record.get("features") or ""
             # add a vs20XX_runtime dependency
-            if not any(d.startswith("vs2") for d in record["depends"]):
-                depends.append(vs_runtime_deps[vc_version])
+            if not any(d.startswith("vs2") for d in depends):
+                depends.append(VS_RUNTIME_DEPS[vc_version])
     elif name == "git":
         # remove any vc dependency, as git does not depend on a specific one
         depends[:] = [dep for dep in depends if not dep.startswith("vc ")]
@@ -347,47 +392,57 @@ def _replace_vc_features_with_vc_pkg_deps(name, record, depends):
                 depends.append("vc %d.*" % vc_version)
 
 
+# packages whose namespace is part of their name
+NAMESPACE_IN_NAME_SET = frozenset((
+    "python-crfsuite",
+    "python-daemon",
+    "python-dateutil",
+    "python-editor",
+    "python-engineio",
+    "python-gflags",
+    "python-ldap",
+    "python-memcached",
+    "python-ntlm",
+    "python-rapidjson",
+    "python-slugify",
+    "python-snappy",
+    "python-socketio",
+    "python-sybase",
+    "python-utils",
+))
+
+# packages with an explicitly set namespace
+NAMESPACE_OVERRIDES = {
+    "boost": "python",
+    "ninja": "global",
+    "numpy-devel": "python",
+    "texlive-core": "global",
+    "keras": "python",
+    "keras-gpu": "python",
+    "git": "global",
+    "python-javapackages-cos7-ppc64le": "global",
+    "anaconda": "python",
+    "conda-env": "python",
+    "tensorflow": "python",
+    "tensorflow-gpu": "python",
+    "xcb-proto": "global",
+    "mxnet": "python",
+}
+
+NAMESPACE_NAMES = NAMESPACE_IN_NAME_SET.union(NAMESPACE_OVERRIDES)
+
+
 def _apply_namespace_overrides(fn, record, instructions):
     record_name = record["name"]
-    namespace_in_name_set = {
-        "python-crfsuite",
-        "python-daemon",
-        "python-dateutil",
-        "python-editor",
-        "python-engineio",
-        "python-gflags",
-        "python-ldap",
-        "python-memcached",
-        "python-ntlm",
-        "python-rapidjson",
-        "python-slugify",
-        "python-snappy",
-        "python-socketio",
-        "python-sybase",
-        "python-utils",
-    }
-    namespace_overrides = {
-        "boost": "python",
-        "ninja": "global",
-        "numpy-devel": "python",
-        "texlive-core": "global",
-        "keras": "python",
-        "keras-gpu": "python",
-        "git": "global",
-        "python-javapackages-cos7-ppc64le": "global",
-        "anaconda": "python",
-        "conda-env": "python",
-        "tensorflow": "python",
-        "tensorflow-gpu": "python",
-        "xcb-proto": "global",
-        "mxnet": "python",
-    }
-    if record_name in namespace_in_name_set and not record.get("namespace_in_name"):
+    if record_name not in NAMESPACE_NAMES:
+        return
+    if record_name in NAMESPACE_IN_NAME_SET and not record.get("namespace_in_name"):
         # set the namespace_in_name field
         instructions["packages"][fn]["namespace_in_name"] = True
-    if namespace_overrides.get(record_name):
+    namespace = NAMESPACE_OVERRIDES.get(record_name)
+    if namespace:
         # explicitly set namespace
-        instructions["packages"][fn]["namespace"] = namespace_overrides[record_name]
+        instructions["packages"][fn]["namespace"] = namespace
 
 
 def _get_record_depends(fn, record, instructions):
@@ -402,7 +457,8 @@ def _get_record_depends(fn, record, instructions):
 
 def _fix_linux_runtime_bounds(depends):
     for i, dep in enumerate(depends):
-        if dep.split()[0] not in LINUX_RUNTIME_DEPS:
+        # the regex only matches these packages, skip it for everything else
+        if not dep.startswith(LINUX_RUNTIME_DEPS):
             continue
         match = LINUX_RUNTIME_RE.match(dep)
         if not match:
@@ -418,24 +474,24 @@ def _fix_linux_runtime_bounds(depends):
 
 
 def _fix_nomkl_features(record, depends):
-    if record["features"] == "nomkl":
-        record["features"] = None
-        if not any(d.startswith("blas ") for d in depends):
-            depends[:] = depends + ["blas * openblas"]
-    elif "nomkl" in record["features"]:
-        # remove nomkl feature
-        record["features"].remove("nomkl")
-        if not any(d.startswith("blas ") for d in depends):
-            depends[:] = depends + ["blas * openblas"]
+    # features is normally a space separated string, but accept a list as well
+    features = record["features"]
+    if isinstance(features, str):
+        features = features.split()
+    if not features or "nomkl" not in features:
+        return
+    # remove nomkl feature
+    record["features"] = " ".join(f for f in features if f != "nomkl") or None
+    if not any(d.startswith("blas ") for d in depends):
+        depends.append("blas * openblas")
 
 
 def _fix_numpy_base_constrains(record, index, instructions, subdir):
     # numpy-base packages should have run constrains on the corresponding numpy package
-    base_pkgs = [d for d in record["depends"] if d.startswith("numpy-base")]
-    if not base_pkgs:
+    base_pkg = next((d for d in record["depends"] if d.startswith("numpy-base")), None)
+    if base_pkg is None:
         # no base package, no hotfixing needed
         return
-    base_pkg = base_pkgs[0]
     try:
         name, ver, build_str = base_pkg.split()
     except ValueError:
@@ -459,44 +515,36 @@ def _fix_numpy_base_constrains(record, index, instructions, subdir):
     instructions["packages"][base_pkg_fn]["constrains"] = [req]
 
 
-def _fix_cudnn_depends(depends, subdir):
+# the same few cudnn/cudatoolkit pin pairs repeat across the CUDA packages
+@functools.lru_cache(maxsize=256)
+def _correct_cudnn_depend(original_cudnn_depend, cudatoolkit_depend, is_win):
+    if is_win:
+        # all packages prior to 2019-01-24 built with cudnn 7.1.4
+        return "cudnn >=7.1.4,<8.0a0"
+    for prefix, correct in CUDNN_7_SUBS.items():
+        if original_cudnn_depend.startswith(prefix):
+            return correct
+    # these packages express a dependeny of 7* or 7.* which is correct for
+    # the cudnn package versions available in defaults but are be rewritten
+    # to be more precise.
+    if original_cudnn_depend.startswith(("cudnn 7*", "cudnn 7.*")):
+        for prefix, correct in CUDNN_7_STAR_SUBS.items():
+            if cudatoolkit_depend.startswith(prefix):
+                return correct
+    if original_cudnn_depend == "cudnn 7.3.*":
+        return "cudnn >=7.3.0,<=8.0a0"
+    raise Exception("unknown cudnn depedency")
+
+
+def _fix_cudnn_depends(depends, is_win):
+    cudatoolkit_depend = None
     for dep in depends:
         if dep.startswith("cudnn"):
             original_cudnn_depend = dep
         if dep.startswith("cudatoolkit"):
             cudatoolkit_depend = dep
-    is_seven_star = original_cudnn_depend.startswith(
-        "cudnn 7*"
-    ) or original_cudnn_depend.startswith("cudnn 7.*")
-    if subdir.startswith("win-"):
-        # all packages prior to 2019-01-24 built with cudnn 7.1.4
-        correct_cudnn_depends = "cudnn >=7.1.4,<8.0a0"
-    else:
-        if original_cudnn_depend.startswith("cudnn 7.0"):
-            correct_cudnn_depends = "cudnn >=7.0.0,<=8.0a0"
-        elif original_cudnn_depend.startswith("cudnn 7.1.*"):
-            correct_cudnn_depends = "cudnn >=7.1.0,<=8.0a0"
-        elif original_cudnn_depend.startswith("cudnn 7.2.*"):
-            correct_cudnn_depends = "cudnn >=7.2.0,<=8.0a0"
-        # these packages express a dependeny of 7* or 7.* which is correct for
-        # the cudnn package versions available in defaults but are be rewritten
-        # to be more precise.
-        # Prior to 2019-01-24 all packages were build against:
-        # cudatoolkit 8.0 : cudnn 7.0.5
-        # cudatoolkit 9.0 : cudnn 7.1.2
-        # cudatoolkit 9.2 : cudnn 7.2.1
-        elif is_seven_star and cudatoolkit_depend.startswith("cudatoolkit 8.0"):
-            correct_cudnn_depends = "cudnn >=7.0.5,<=8.0a0"
-        elif is_seven_star and cudatoolkit_depend.startswith("cudatoolkit 9.0"):
-            correct_cudnn_depends = "cudnn >=7.1.2,<=8.0a0"
-        elif is_seven_star and cudatoolkit_depend.startswith("cudatoolkit 9.2"):
-            correct_cudnn_depends = "cudnn >=7.2.1,<=8.0a0"
-        elif original_cudnn_depend == "cudnn 7.3.*":
-            correct_cudnn_depends = "cudnn >=7.3.0,<=8.0a0"
-        else:
-            raise Exception("unknown cudnn depedency")
     idx = depends.index(original_cudnn_depend)
-    depends[idx] = correct_cudnn_depends
+    depends[idx] = _correct_cudnn_depend(original_cudnn_depend, cudatoolkit_depend, is_win)
 
 
 def _patch_repodata(repodata, subdir):
@@ -513,58 +561,92 @@ def _patch_repodata(repodata, subdir):
             "meld3": "python:meld3",  # supervisor
             "msys2-conda-epoch": "global:msys2-conda-epoch",  # anaconda
         }
+    if not index:
+        # nothing to revoke, remove or patch; skip the per-record pass
+        return instructions
+    removed = _matching_fns(_REMOVALS_PATTERNS, index, subdir)
+    instructions["revoke"] = sorted(_matching_fns(_REVOKED_PATTERNS, index, subdir))
+    instructions["remove"] = sorted(removed)
     for fn, record in index.items():
-        if is_revoked(fn, subdir):
-            instructions["revoke"].append(fn)
-        if is_removed(fn, subdir):
-            instructions["remove"].append(fn)
+        if fn in removed:
+            # removed packages never reach the index, don't bother patching them. A removed numpy
+            # still constrains its numpy-base though, which may stay in the index
+            if record["name"] == "numpy":
+                _fix_numpy_base_constrains(record, index, instructions, subdir)
+            continue
         _apply_namespace_overrides(fn, record, instructions)
         patch_record(fn, record, subdir, instructions, index)
-    instructions["remove"].sort()
-    instructions["revoke"].sort()
     return instructions
 
 
+_GLOB_CHARS_RE = re.compile(r"[*?\[]")
+
+
+def _compile_globs(patterns):
+    # split the patterns into exact filenames, checked with a set lookup, and
+    # globs, joined into one alternation instead of an fnmatch call per
+    # pattern.  The literal prefixes of the globs let most filenames be
+    # rejected with a single str.startswith before reaching the regex.
+    exact = frozenset(p for p in patterns if not _GLOB_CHARS_RE.search(p))
+    globs = [p for p in patterns if p not in exact]
+    prefixes = tuple(sorted({_GLOB_CHARS_RE.split(p, 1)[0] for p in globs}))
+    glob_re = re.compile("|".join(map(fnmatch.translate, globs))) if globs else None
+    return exact, prefixes, glob_re
+
+
+def _compile_table(table):
+    # merge the "any" patterns into every subdir's, so a filename is matched
+    # against a single set and regex; "any" on its own covers other subdirs
+    any_patterns = list(table.get("any", ()))
+    return {subdir: _compile_globs(list(patterns) + (any_patterns if subdir != "any" else []))
+            for subdir, patterns in table.items()}
+
+
+_REVOKED_PATTERNS = _compile_table(REVOKED)
+_REMOVALS_PATTERNS = _compile_table(REMOVALS)
+_NO_PATTERNS = (frozenset(), (), None)
+
+
+def _matches(compiled, fn, subdir):
+    exact, prefixes, glob_re = compiled.get(subdir) or compiled.get("any", _NO_PATTERNS)
+    return fn in exact or (fn.startswith(prefixes) and glob_re.match(fn) is not None)
+
+
+def _matching_fns(compiled, fns, subdir):
+    # bulk version of _matches, returns the set of matching filenames
+    exact, prefixes, glob_re = compiled.get(subdir) or compiled.get("any", _NO_PATTERNS)
+    if not exact and glob_re is None:
+        # no patterns for this subdir, no need to walk its index
+        return set()
+    matched = set(exact.intersection(fns))
+    if glob_re is not None:
+        matched.update(filter(glob_re.match, (fn for fn in fns if fn.startswith(prefixes))))
+    return matched
+
+
 def is_revoked(fn, subdir):
-    for rev in REVOKED.get(subdir, []):
-        if fnmatch.fnmatch(fn, rev):
-            return True
-    for rev in REVOKED.get("any", []):
-        if fnmatch.fnmatch(fn, rev):
-            return True
-    return False
+    return _matches(_REVOKED_PATTERNS, fn, subdir)
 
 
 def is_removed(fn, subdir):
-    for rev in REMOVALS.get(subdir, []):
-        if fnmatch.fnmatch(fn, rev):
-            return True
-    for rev in REMOVALS.get("any", []):
-        if fnmatch.fnmatch(fn, rev):
-            return True
-    return False
+    return _matches(_REMOVALS_PATTERNS, fn, subdir)
 
 
 def patch_record(fn, record, subdir, instructions, index):
-    # create a copy of the record, patch in-place and add keys that change
+    # snapshot the patched keys, patch in-place and add keys that change
     # to the patch instructions
-    original_record = copy.deepcopy(record)
+    # (only list values are mutated in place, so a shallow copy is enough)
+    original_record = {}
+    for key in PATCHED_KEYS:
+        value = record.get(key)
+        original_record[key] = list(value) if isinstance(value, list) else value
     patch_record_in_place(fn, record, subdir)
-    keys_to_check = [
-        "app_entry",
-        "app_type",
-        "constrains",
-        "depends",
-        "features",
-        "namespace",
-        "license_family",
-        "subdir",
-        "track_features",
-        "type",
-    ]
-    for key in keys_to_check:
-        if record.get(key) != original_record.get(key):
-            instructions["packages"][fn][key] = record.get(key)
+    # collect the changes locally and write them to the instructions once
+    patched = {}
+    for key in PATCHED_KEYS:
+        value = record.get(key)
+        if value != original_record[key]:
+            patched[key] = value
 
     # One-off patches that do not fit in with others
     if record["name"] == "numpy":
@@ -572,537 +654,872 @@ def patch_record(fn, record, subdir, instructions, index):
 
     # set a specific timestamp for numba-0.36.1
     if fn.startswith("numba-0.36.1") and record.get("timestamp") != 1512604800000:
-        instructions["packages"][fn]["timestamp"] = 1512604800000
+        patched["timestamp"] = 1512604800000
 
     # set the build_number of the blas-1.0-openblas.tar.bz2 package
     # to 7 to match the package in free
     # https://github.com/conda/conda/issues/8302
     if subdir == "linux-ppc64le" and fn == "blas-1.0-openblas.tar.bz2":
-        instructions["packages"][fn]["build_number"] = 7
+        patched["build_number"] = 7
+
+    if patched:
+        instructions["packages"][fn].update(patched)
+
+
+@functools.lru_cache(maxsize=None)
+def _vo(version):
+    """Return the (cached) :class:`VersionOrder` of a version string."""
+    return VersionOrder(version)
+
+
+# hotfixes applied by patch_record_in_place, in the order they are defined:
+# (names, needs_trigger, func); an empty names set applies to every record
+_HOTFIXES = []
+_PIPELINES = {}
+
+# depends prefixes that the cudnn/mkl/numpy hotfixes below look for; records
+# with none of them skip those hotfixes entirely. Searched for in all of a
+# record's depends joined by newlines, hence the multiline anchor and the
+# whitespace classes that don't cross into the next dependency.
+_DEPS_TRIGGER = re.compile(r"^(?:cudnn 7|[^\S\n]*mkl[^\S\n]+>=2018|mkl >=2019|numpy >=1\.21\.5,)", re.MULTILINE)
+
+
+def _hotfix(*names, prefix=None, subdirs=None, trigger=False):
+    """
+    Register a hotfix for :func:`patch_record_in_place`. Hotfixes are called with the :class:`_RecordState` of the
+    record being patched.
+
+    :param names: Package names the hotfix applies to. Applies to every record if empty and no prefix is given.
+    :param prefix: Also apply the hotfix to package names starting with this prefix.
+    :param subdirs: Prefixes of the subdirs the hotfix applies to. Applies to every subdir if not given.
+    :param trigger: Only apply the hotfix if a dependency starts with one of the :data:`_DEPS_TRIGGER` prefixes.
+    """
+    def register(func):
+        _HOTFIXES.append((frozenset(names), prefix, subdirs, trigger, func))
+        return func
+    return register
+
+
+def _pipeline(name, subdir, triggered):
+    """Return the hotfixes that apply to a package name in a subdir, in order of application."""
+    key = (name, subdir, triggered)
+    pipeline = _PIPELINES.get(key)
+    if pipeline is None:
+        pipeline = _PIPELINES[key] = tuple(
+            func
+            for names, prefix, subdirs, needs_trigger, func in _HOTFIXES
+            if (name in names or (prefix and name.startswith(prefix)) or not (names or prefix))
+            and (subdirs is None or subdir.startswith(subdirs))
+            and (triggered or not needs_trigger)
+        )
+    return pipeline
+
+
+class _RecordState:
+    """
+    The record being patched, with the fields the hotfixes read looked up once.
+
+    ``depends`` and ``constrains`` are the lists as they were before any hotfix ran; hotfixes that
+    replace the lists on ``record`` itself don't rebind them.
+    """
+
+    __slots__ = (
+        "fn", "record", "subdir", "is_win", "name", "version", "build", "build_number", "depends", "constrains",
+        "_version_order",
+    )
+
+    def __init__(self, fn, record, subdir):
+        self.fn = fn
+        self.record = record
+        self.subdir = subdir
+        self.is_win = subdir.startswith("win-")
+        self.name = record["name"]
+        self.version = record["version"]
+        self.build = record["build"]
+        self.build_number = record["build_number"]
+        self.depends = record["depends"]
+        self.constrains = record.get("constrains", [])
+        self._version_order = None
+
+    @property
+    def version_order(self):
+        """``VersionOrder`` of the record's version, parsed on first use."""
+        if self._version_order is None:
+            self._version_order = _vo(self.version)
+        return self._version_order
 
 
 def patch_record_in_place(fn, record, subdir):
     """Patch record in place"""
-    name = record["name"]
-    version = record["version"]
-    build = record["build"]
-    build_number = record["build_number"]
-    depends = record["depends"]
-    constrains = record.get("constrains", [])
-
-    ##########
-    # subdir #
-    ##########
-
-    if "subdir" not in record:
-        record["subdir"] = subdir
-
-    #############
-    # namespace #
-    #############
-
-    if name == "conda-env" and not any(d.startswith("python") for d in depends):
-        record["namespace"] = "python"
-
-    ################
-    # CUDA related #
-    ################
-
-    # add run constrains on __cuda virtual package to cudatoolkit package
-    # see https://github.com/conda/conda/issues/9115
-    if name == "cudatoolkit" and "constrains" not in record:
-        major, minor = version.split(".")[:2]
-        req = f"__cuda >={major}.{minor}"
-        record["constrains"] = [req]
+    pkg = _RecordState(fn, record, subdir)
+    triggered = _DEPS_TRIGGER.search("\n".join(pkg.depends)) is not None
+    for hotfix in _pipeline(pkg.name, subdir, triggered):
+        hotfix(pkg)
 
-    if any(dep.startswith("cudnn 7") for dep in depends):
-        _fix_cudnn_depends(depends, subdir)
 
-    # cudatoolkit should be pinning to major.minor not just major
-    if name in ("cupy", "nccl"):
-        for i, dep in enumerate(depends):
-            depends[i] = CUDATK_SUBS[dep] if dep in CUDATK_SUBS else dep
+##########
+# subdir #
+##########
 
-    # depends in package is set as cudatoolkit 9.*, should be 9.0.*
-    if fn == "cupti-9.0.176-0.tar.bz2":
-        replace_dep(depends, "cudatoolkit 9.*", "cudatoolkit 9.0.*")
+@_hotfix()
+def _fix_subdir(pkg):
+    if "subdir" not in pkg.record:
+        pkg.record["subdir"] = pkg.subdir
 
-    #######
-    # MKL #
-    #######
 
-    if name == "numpy-base" and any(_.startswith("mkl >=2018") for _ in depends):
-        depends.append("tbb4py")
+#############
+# namespace #
+#############
 
-    for i, dep in enumerate(depends):
-        if (
-            dep.split()[0] == "mkl"
-            and len(dep.split()) > 1
-            and MKL_VERSION_2018_RE.match(dep.split()[1])
-        ):
-            depends[i] = MKL_VERSION_2018_EXTENDED_RC.sub(
-                "%s,<2019.0a0" % (dep.split()[1]), dep
-            )
-
-    # intel-openmp 2020.* seems to be incompatible with older versions of mkl
-    # issues have only been reported on macOS and Windows but
-    # add the constrains on all platforms to be safe
-    if name == "intel-openmp" and version.startswith("2020"):
-        minor_version = version.split(".")[1]
-        record["constrains"] = [f"mkl >=2020.{minor_version}"]
+@_hotfix("conda-env")
+def _fix_conda_env(pkg):
+    if not any(d.startswith("python") for d in pkg.depends):
+        pkg.record["namespace"] = "python"
 
-    # mkl 2020.x is compatible with 2019.x
-    # so mkl >=2019.x,<2020.0a0 becomes mkl >=2019.x,<2021.0a0
-    # except on osx-64, older macOS release have problems...
-    for i, dep in enumerate(depends):
-        if dep.startswith("mkl >=2019") and dep.endswith(",<2020.0a0"):
-            if subdir != "osx-64":
-                expanded_dep = dep.replace(",<2020.0a0", ",<2021.0a0")
-                depends[i] = expanded_dep
-
-    # some of these got hard-coded to overly restrictive values
-    if name in ("scikit-learn", "pytorch"):
-        for i, dep in enumerate(depends):
-            if dep.startswith("mkl 2018") and not any(
-                _.startswith("mkl >") for _ in depends
-            ):
-                depends[i] = "mkl >=2018.0.3,<2019.0a0"
-        if "mkl 2018.*" in depends:
-            depends.pop(depends.index("mkl 2018.*"))
-
-    ########
-    # BLAS #
-    ########
-
-    if "features" in record:
-        _fix_nomkl_features(record, depends)
-
-    if name in ("mkl_random", "mkl_fft"):
-        if not any(re.match(r"blas\s.*\smkl", dep) for dep in record["depends"]):
-            depends.append("blas * mkl")
-
-    if name in ("openblas", "openblas-devel"):
-        for i, dep in enumerate(depends):
-            if dep.split()[0] == "nomkl":
-                depends[i] = "nomkl 3.0 0"
-
-    if name == "openblas-devel" and not any(d.startswith("blas ") for d in depends):
-        depends.append("blas * openblas")
 
-    if name == "mkl-devel" and not any(d.startswith("blas") for d in depends):
-        depends.append("blas * mkl")
-
-    # add in blas mkl metapkg for mutex behavior on packages that have just mkl deps
-    if name in BLAS_USING_PKGS and not any(dep.split()[0] == "blas" for dep in depends):
-        if any(dep.split()[0] == "mkl" for dep in depends):
-            depends.append("blas * mkl")
-        elif any(dep.split()[0] in ("openblas", "libopenblas") for dep in depends):
-            depends.append("blas * openblas")
-
-    #########
-    # numpy #
-    #########
-
-    # Correct packages mistakenly built against 1.21.5 on linux-aarch64
-    # Replaces the dependency bound with 1.21.2. These packages should
-    # actually have been built against an even earlier version of numpy.
-    # This is the safest correction we can make for now
-    if subdir == "linux-aarch64":
-        for i, dep in enumerate(depends):
-            if dep.startswith("numpy >=1.21.5,"):
-                depends[i] = depends[i].replace(">=1.21.5,", ">=1.21.2,")
-                break
+################
+# CUDA related #
+################
 
-    ###########
-    # pytorch #
-    ###########
-
-    if name == "pytorch":
-        # pytorch was built with nccl 1.x
-        replace_dep(depends, "nccl", "nccl <2")
-
-        # Impose our BLAS mutex so users don't accidentally mix OpenBLAS and
-        # MKL within a single environment.  In theory, having multiple BLAS
-        # implementations in an environment isn't a problem; in practice,
-        # however, this can lead to all sorts of problems due to other
-        # dependencies (like OpenMP implementations) being dragged in.
-        if subdir.endswith("-64") and not any(dep.startswith("blas ") for dep in depends):
-            if any(dep.startswith("libopenblas") for dep in depends):
-                depends.append("blas * openblas")
-            if any(dep.startswith("mkl ") for dep in depends):
-                depends.append("blas * mkl")
-
-        depends.sort()
-
-    if name == "torchvision" and version == "0.3.0":
-        replace_dep(depends, "pytorch >=1.1.0", "pytorch 1.1.*")
-        if "pytorch >=1.1.0" in depends:
+# add run constrains on __cuda virtual package to cudatoolkit package
+# see https://github.com/conda/conda/issues/9115
+@_hotfix("cudatoolkit")
+def _fix_cudatoolkit(pkg):
+    if "constrains" not in pkg.record:
+        major, minor = pkg.version.split(".")[:2]
+        req = f"__cuda >={major}.{minor}"
+        pkg.record["constrains"] = [req]
+
+
+@_hotfix(trigger=True)
+def _fix_cudnn_7(pkg):
+    if any(dep.startswith("cudnn 7") for dep in pkg.depends):
+        _fix_cudnn_depends(pkg.depends, pkg.is_win)
+
+
+def _substitute_deps(depends, subs):
+    # swap the dependencies that are keys of subs in place, keeping their
+    # position; most records have none of them
+    if not subs.keys().isdisjoint(depends):
+        depends[:] = [subs.get(dep, dep) for dep in depends]
+
+
+# cudatoolkit should be pinning to major.minor not just major
+@_hotfix("cupy", "nccl")
+def _fix_cupy_nccl(pkg):
+    _substitute_deps(pkg.depends, CUDATK_SUBS)
+
+
+# depends in package is set as cudatoolkit 9.*, should be 9.0.*
+@_hotfix("cupti")
+def _fix_cupti(pkg):
+    if pkg.fn == "cupti-9.0.176-0.tar.bz2":
+        replace_dep(pkg.depends, "cudatoolkit 9.*", "cudatoolkit 9.0.*")
+
+
+#######
+# MKL #
+#######
+
+@_hotfix("numpy-base")
+def _fix_numpy_base_tbb(pkg):
+    if any(_.startswith("mkl >=2018") for _ in pkg.depends):
+        pkg.depends.append("tbb4py")
+
+
+# a single pass over depends that rewrites the mkl and numpy pins below
+@_hotfix(trigger=True)
+def _fix_mkl_numpy_pins(pkg):
+    fix_numpy = pkg.subdir == "linux-aarch64"
+    for i, dep in enumerate(pkg.depends):
+        # only the name and version are needed, leave any build string joined
+        parts = dep.split(None, 2)
+        if parts[0] == "mkl" and len(parts) > 1 and MKL_VERSION_2018_RE.match(parts[1]):
+            pkg.depends[i] = MKL_VERSION_2018_EXTENDED_RC.sub("%s,<2019.0a0" % (parts[1]), dep)
+
+        # mkl 2020.x is compatible with 2019.x
+        # so mkl >=2019.x,<2020.0a0 becomes mkl >=2019.x,<2021.0a0
+        # except on osx-64, older macOS release have problems...
+        elif dep.startswith("mkl >=2019") and dep.endswith(",<2020.0a0"):
+            if pkg.subdir != "osx-64":
+                pkg.depends[i] = dep.replace(",<2020.0a0", ",<2021.0a0")
+
+        # Correct packages mistakenly built against 1.21.5 on linux-aarch64
+        # Replaces the (first) dependency bound with 1.21.2. These packages should
+        # actually have been built against an even earlier version of numpy.
+        # This is the safest correction we can make for now
+        elif fix_numpy and dep.startswith("numpy >=1.21.5,"):
+            pkg.depends[i] = dep.replace(">=1.21.5,", ">=1.21.2,")
+            fix_numpy = False
+
+
+# intel-openmp 2020.* seems to be incompatible with older versions of mkl
+# issues have only been reported on macOS and Windows but
+# add the constrains on all platforms to be safe
+@_hotfix("intel-openmp")
+def _fix_intel_openmp(pkg):
+    version = pkg.version
+    if version.startswith("2020"):
+        minor_version = version.split(".")[1]
+        pkg.record["constrains"] = [f"mkl >=2020.{minor_version}"]
+
+
+# some of these got hard-coded to overly restrictive values
+@_hotfix("scikit-learn", "pytorch")
+def _fix_mkl_2018_pins(pkg):
+    # only the first mkl 2018 pin is loosened, and only if there is no lower bound yet; a leftover
+    # "mkl 2018.*" after that is dropped
+    has_lower_bound = any(dep.startswith("mkl >") for dep in pkg.depends)
+    dropped = False
+    depends = []
+    for dep in pkg.depends:
+        if not has_lower_bound and dep.startswith("mkl 2018"):
+            dep = "mkl >=2018.0.3,<2019.0a0"
+            has_lower_bound = True
+        elif not dropped and dep == "mkl 2018.*":
+            dropped = True
+            continue
+        depends.append(dep)
+    pkg.depends[:] = depends
+
+
+########
+# BLAS #
+########
+
+@_hotfix()
+def _fix_nomkl(pkg):
+    if "features" in pkg.record:
+        _fix_nomkl_features(pkg.record, pkg.depends)
+
+
+_BLAS_MKL_RE = re.compile(r"blas\s.*\smkl")
+
+
+@_hotfix("mkl_random", "mkl_fft")
+def _fix_mkl_random_fft(pkg):
+    if not any(_BLAS_MKL_RE.match(dep) for dep in pkg.record["depends"]):
+        pkg.depends.append("blas * mkl")
+
+
+@_hotfix("openblas", "openblas-devel")
+def _fix_openblas_nomkl(pkg):
+    for i, dep in enumerate(pkg.depends):
+        if dep.split(None, 1)[0] == "nomkl":
+            pkg.depends[i] = "nomkl 3.0 0"
+
+
+@_hotfix("openblas-devel")
+def _fix_openblas_devel(pkg):
+    if not any(d.startswith("blas ") for d in pkg.depends):
+        pkg.depends.append("blas * openblas")
+
+
+@_hotfix("mkl-devel")
+def _fix_mkl_devel(pkg):
+    if not any(d.startswith("blas") for d in pkg.depends):
+        pkg.depends.append("blas * mkl")
+
+
+# add in blas mkl metapkg for mutex behavior on packages that have just mkl deps
+@_hotfix(*BLAS_USING_PKGS)
+def _fix_blas_mutex(pkg):
+    has_blas = has_mkl = has_openblas = False
+    for dep in pkg.depends:
+        dep_name = dep.partition(" ")[0]
+        if dep_name == "blas":
+            has_blas = True
+        elif dep_name == "mkl":
+            has_mkl = True
+        elif dep_name in {"openblas", "libopenblas"}:
+            has_openblas = True
+    if not has_blas:
+        if has_mkl:
+            pkg.depends.append("blas * mkl")
+        elif has_openblas:
+            pkg.depends.append("blas * openblas")
+
+
+###########
+# pytorch #
+###########
+
+@_hotfix("pytorch")
+def _fix_pytorch(pkg):
+    # pytorch was built with nccl 1.x
+    replace_dep(pkg.depends, "nccl", "nccl <2")
+
+    # Impose our BLAS mutex so users don't accidentally mix OpenBLAS and
+    # MKL within a single environment.  In theory, having multiple BLAS
+    # implementations in an environment isn't a problem; in practice,
+    # however, this can lead to all sorts of problems due to other
+    # dependencies (like OpenMP implementations) being dragged in.
+    if pkg.subdir.endswith("-64"):
+        has_blas = has_mkl = has_openblas = False
+        for dep in pkg.depends:
+            if dep.startswith("blas "):
+                has_blas = True
+            elif dep.startswith("libopenblas"):
+                has_openblas = True
+            elif dep.startswith("mkl "):
+                has_mkl = True
+        if not has_blas:
+            if has_openblas:
+                pkg.depends.append("blas * openblas")
+            if has_mkl:
+                pkg.depends.append("blas * mkl")
+
+    # this is the last hotfix that appends to pytorch's depends, the generic ones after it only go through
+    # replace_dep (which keeps a sorted list sorted) or rewrite entries in place, so sort here rather than at
+    # the end of the pipeline
+    pkg.depends.sort()
+
+
+@_hotfix("torchvision")
+def _fix_torchvision(pkg):
+    version = pkg.version
+    if version == "0.3.0":
+        replace_dep(pkg.depends, "pytorch >=1.1.0", "pytorch 1.1.*")
+        if "pytorch >=1.1.0" in pkg.depends:
             # torchvision pytorch depends needs to be fixed to 1.1
-            pytorch_dep = depends.index("pytorch >=1.1.0")
-            depends[pytorch_dep] = "pytorch 1.1.*"
+            pytorch_dep = pkg.depends.index("pytorch >=1.1.0")
+            pkg.depends[pytorch_dep] = "pytorch 1.1.*"
 
-    if name == "torchvision" and version == "0.4.0":
-        if "cuda" in record["build"]:
-            depends.append("_pytorch_select 0.2")
+    if version == "0.4.0":
+        if "cuda" in pkg.build:
+            pkg.depends.append("_pytorch_select 0.2")
         else:
-            depends.append("_pytorch_select 0.1")
-
-    #########
-    # scipy #
-    #########
-
-    if name == "scipy":
-        # Our original build of scipy-1.7.3 (build number 0) did not comply with the
-        # upstream's min and max numpy pinnings.
-        # See: https://github.com/scipy/scipy/blob/v1.7.3/setup.py#L551-L552
-        if version == "1.7.3" and build_number == 0:
-            if subdir != 'osx-arm64' and not build.startswith("py310"):
-                replace_dep(depends, "numpy >=1.16.6,<2.0a0", "numpy >=1.16.6,<1.23.0")
-            if subdir == 'osx-arm64' and not build.startswith("py310"):
-                replace_dep(depends, "numpy >=1.19.5,<2.0a0", "numpy >=1.19.5,<1.23.0")
-            if build.startswith("py310"):
-                replace_dep(depends, "numpy >=1.21.2,<2.0a0", "numpy >=1.21.2,<1.23.0")
-        # scipy needs at least nympy 1.19.5
-        # https://github.com/scipy/scipy/blob/v1.10.0/pyproject.toml#L78
-        elif version == "1.10.0" and build_number == 0:
-            if build[:4] in ["py37", "py38", "py39"]:
-                replace_dep(depends, "numpy >=1.19,<1.27.0", "numpy >=1.19.5,<1.27.0")
-        # scipy needs at least nympy 1.22.4
-        # https://github.com/scipy/scipy/blob/v1.12.0/pyproject.toml#L24
-        elif version == "1.12.0" and build_number == 0:
-            if build[:4] in ["py39", "py310"]:
-                replace_dep(depends, "numpy >=1.22.3,<1.29", "numpy >=1.22.4,<1.29")
-
-    ######################
-    # scipy dependencies #
-    ######################
-    # scipy 1.8 and 1.9 introduce breaking API changes impacting these packages
-    if name == "theano":
-        if version in ["1.0.4", "1.0.5"]:
-            replace_dep(depends, "scipy >=0.14", "scipy >=0.14,<1.8")
-        elif version in ["0.9.0", "1.0.1", "1.0.2", "1.0.3"]:
-            replace_dep(depends, "scipy >=0.14.0", "scipy >=0.14,<1.8")
-    if name == "theano-pymc":
-        replace_dep(depends, "scipy >=0.14", "scipy >=0.14,<1.8")
-    if name == "pyamg" and version in ["3.3.2", "4.0.0", "4.1.0"]:
-        replace_dep(depends, "scipy >=0.12.0", "scipy >=0.12.0,<1.8")
-
-    ##############
-    # tensorflow #
-    ##############
-
-    tflow_pkg = name in [
-        "tensorflow",
-        "tensorflow-gpu",
-        "tensorflow-eigen",
-        "tensorflow-mkl",
-    ]
-    if tflow_pkg and version in ["1.8.0", "1.9.0", "1.10.0"]:
-        for i, dep in enumerate(depends):
-            depends[i] = TFLOW_SUBS[dep] if dep in TFLOW_SUBS else dep
-
-    if name == "keras":
-        version_parts = version.split(".")
-        if int(version_parts[0]) <= 2 and int(version_parts[1]) < 3:
-            for i, dep in enumerate(depends):
-                if dep.startswith("tensorflow"):
-                    depends[i] = "tensorflow <2.0"
-
-    # tensorboard 2.0.0 build 0 should have a requirement on setuptools >=41.0.0
-    # see: https://github.com/AnacondaRecipes/tensorflow_recipes/issues/20
-    if name == "tensorboard" and version == "2.0.0" and build_number == 0:
-        depends.append("setuptools >=41.0.0")
-
-    if name.startswith("tensorflow-base") and version == "2.4.1":
-        replace_dep(depends, "gast", "gast 0.3.3")
+            pkg.depends.append("_pytorch_select 0.1")
+
+
+#########
+# scipy #
+#########
+
+@_hotfix("scipy")
+def _fix_scipy(pkg):
+    version = pkg.version
+    build = pkg.build
+    build_number = pkg.build_number
+    # Our original build of scipy-1.7.3 (build number 0) did not comply with the
+    # upstream's min and max numpy pinnings.
+    # See: https://github.com/scipy/scipy/blob/v1.7.3/setup.py#L551-L552
+    if version == "1.7.3" and build_number == 0:
+        if pkg.subdir != 'osx-arm64' and not build.startswith("py310"):
+            replace_dep(pkg.depends, "numpy >=1.16.6,<2.0a0", "numpy >=1.16.6,<1.23.0")
+        if pkg.subdir == 'osx-arm64' and not build.startswith("py310"):
+            replace_dep(pkg.depends, "numpy >=1.19.5,<2.0a0", "numpy >=1.19.5,<1.23.0")
+        if build.startswith("py310"):
+            replace_dep(pkg.depends, "numpy >=1.21.2,<2.0a0", "numpy >=1.21.2,<1.23.0")
+    # scipy needs at least nympy 1.19.5
+    # https://github.com/scipy/scipy/blob/v1.10.0/pyproject.toml#L78
+    elif version == "1.10.0" and build_number == 0:
+        if build[:4] in ["py37", "py38", "py39"]:
+            replace_dep(pkg.depends, "numpy >=1.19,<1.27.0", "numpy >=1.19.5,<1.27.0")
+    # scipy needs at least nympy 1.22.4
+    # https://github.com/scipy/scipy/blob/v1.12.0/pyproject.toml#L24
+    elif version == "1.12.0" and build_number == 0:
+        if build[:4] in ["py39", "py310"]:
+            replace_dep(pkg.depends, "numpy >=1.22.3,<1.29", "numpy >=1.22.4,<1.29")
+
+
+######################
+# scipy dependencies #
+######################
+# scipy 1.8 and 1.9 introduce breaking API changes impacting these packages
+
+@_hotfix("theano")
+def _fix_theano(pkg):
+    version = pkg.version
+    if version in ["1.0.4", "1.0.5"]:
+        replace_dep(pkg.depends, "scipy >=0.14", "scipy >=0.14,<1.8")
+    elif version in ["0.9.0", "1.0.1", "1.0.2", "1.0.3"]:
+        replace_dep(pkg.depends, "scipy >=0.14.0", "scipy >=0.14,<1.8")
+
+
+@_hotfix("theano-pymc")
+def _fix_theano_pymc(pkg):
+    replace_dep(pkg.depends, "scipy >=0.14", "scipy >=0.14,<1.8")
+
+
+@_hotfix("pyamg")
+def _fix_pyamg(pkg):
+    if pkg.version in ["3.3.2", "4.0.0", "4.1.0"]:
+        replace_dep(pkg.depends, "scipy >=0.12.0", "scipy >=0.12.0,<1.8")
+
+
+##############
+# tensorflow #
+##############
+
+@_hotfix("tensorflow", "tensorflow-gpu", "tensorflow-eigen", "tensorflow-mkl")
+def _fix_tensorflow_select(pkg):
+    if pkg.version in ["1.8.0", "1.9.0", "1.10.0"]:
+        _substitute_deps(pkg.depends, TFLOW_SUBS)
+
+
+@_hotfix("keras")
+def _fix_keras(pkg):
+    version_parts = pkg.version.split(".")
+    if int(version_parts[0]) <= 2 and int(version_parts[1]) < 3:
+        for i, dep in enumerate(pkg.depends):
+            if dep.startswith("tensorflow"):
+                pkg.depends[i] = "tensorflow <2.0"
+
+
+# tensorboard 2.0.0 build 0 should have a requirement on setuptools >=41.0.0
+# see: https://github.com/AnacondaRecipes/tensorflow_recipes/issues/20
+@_hotfix("tensorboard")
+def _fix_tensorboard(pkg):
+    if pkg.version == "2.0.0" and pkg.build_number == 0:
+        pkg.depends.append("setuptools >=41.0.0")
+
+
+_VO_2_6_0 = _vo("2.6.0")
+_VO_2_5_0 = _vo("2.5.0")
+
+
+@_hotfix(prefix="tensorflow-base")
+def _fix_tensorflow_base(pkg):
+    version = pkg.version
+
+    if version == "2.4.1":
+        replace_dep(pkg.depends, "gast", "gast 0.3.3")
 
     # Relax the scipy pin slightly on linux-64 for tensorflow-base 2.8.2
     # to match linux-aarch64, to facilitate intel/arm version alignment.
-    if name.startswith("tensorflow-base") and version == "2.8.2" and subdir == 'linux-64':
-        for i, dep in enumerate(depends):
+    if version == "2.8.2" and pkg.subdir == 'linux-64':
+        for i, dep in enumerate(pkg.depends):
             if dep == "scipy >=1.7.3":
-                depends[i] = "scipy >=1.7.1"
+                pkg.depends[i] = "scipy >=1.7.1"
                 break
 
-    # Tensorflow numpy incompatibilites
-    if name.startswith("tensorflow-base"):
-        if VersionOrder(version) <= VersionOrder("2.6.0"):
-            replace_dep(depends, "numpy >=1.20", "numpy >=1.20,<2.0a0")
-        if VersionOrder(version) <= VersionOrder("2.5.0"):
-            replace_dep(depends, "numpy >=1.16.6,<2.0a0", "numpy >=1.16.6,<1.24.0a0")
-
-    ##############
-    # versioneer #
-    ##############
-
-    if name == "versioneer" and record["license_family"].upper() == "NONE":
-        record["license_family"] = "PUBLIC-DOMAIN"
-
-    ##############
-    # constrains #
-    ##############
-
-    # setuptools should not appear in both depends and constrains
-    # https://github.com/conda/conda/issues/9337
-    if name == "conda" and "setuptools >=31.0.1" in constrains:
-        constrains[:] = [req for req in constrains if not req.startswith("setuptools")]
-
-    # basemap is incompatible with proj/proj4 >=6
-    # https://github.com/ContinuumIO/anaconda-issues/issues/11590
-    # Adding update to constraint to capture data reorg in the project.
-    if name == "basemap" and VersionOrder(version) < VersionOrder("1.3.0"):
-        record["constrains"] = ["proj4 <6", "proj <6"]
-
-    # 'cryptography' + pyopenssl incompatibility 28 Feb 2023 #
-    if name == "cryptography" and VersionOrder(version) >= VersionOrder("39.0.1"):
+    # Tensorflow numpy incompatibilites; most builds have neither pin, so look for it before
+    # comparing versions
+    if "numpy >=1.20" in pkg.depends and pkg.version_order <= _VO_2_6_0:
+        replace_dep(pkg.depends, "numpy >=1.20", "numpy >=1.20,<2.0a0")
+    if "numpy >=1.16.6,<2.0a0" in pkg.depends and pkg.version_order <= _VO_2_5_0:
+        replace_dep(pkg.depends, "numpy >=1.16.6,<2.0a0", "numpy >=1.16.6,<1.24.0a0")
+
+
+##############
+# versioneer #
+##############
+
+@_hotfix("versioneer")
+def _fix_versioneer(pkg):
+    if pkg.record["license_family"].upper() == "NONE":
+        pkg.record["license_family"] = "PUBLIC-DOMAIN"
+
+
+##############
+# constrains #
+##############
+
+# setuptools should not appear in both depends and constrains
+# https://github.com/conda/conda/issues/9337
+@_hotfix("conda")
+def _fix_conda_setuptools(pkg):
+    if "setuptools >=31.0.1" in pkg.constrains:
+        pkg.constrains[:] = [req for req in pkg.constrains if not req.startswith("setuptools")]
+
+
+_VO_1_3_0 = _vo("1.3.0")
+
+
+# basemap is incompatible with proj/proj4 >=6
+# https://github.com/ContinuumIO/anaconda-issues/issues/11590
+# Adding update to constraint to capture data reorg in the project.
+@_hotfix("basemap")
+def _fix_basemap(pkg):
+    if pkg.version_order < _VO_1_3_0:
+        pkg.record["constrains"] = ["proj4 <6", "proj <6"]
+
+
+_VO_39_0_1 = _vo("39.0.1")
+
+
+# 'cryptography' + pyopenssl incompatibility 28 Feb 2023 #
+@_hotfix("cryptography")
+def _fix_cryptography(pkg):
+    if pkg.version_order >= _VO_39_0_1:
         # or pyopenssl should have a max cryptography version set
-        record["constrains"] = ["pyopenssl >=23.0.0"]
+        pkg.record["constrains"] = ["pyopenssl >=23.0.0"]
 
-    ############
-    # features #
-    ############
 
-    if subdir.startswith("win-"):
-        _replace_vc_features_with_vc_pkg_deps(name, record, depends)
+############
+# features #
+############
 
-    ##################
-    # track_features #
-    ##################
+@_hotfix(subdirs=("win-",))
+def _fix_vc_features(pkg):
+    _replace_vc_features_with_vc_pkg_deps(pkg.name, pkg.record, pkg.depends)
+
+
+##################
+# track_features #
+##################
+
+# reset dependencies for nomkl to the blas metapkg and remove any
+#      track_features (these are attached to the metapkg instead)
+@_hotfix("nomkl")
+def _fix_nomkl_metapkg(pkg):
+    if not pkg.is_win:
+        pkg.record["depends"] = ["blas * openblas"]
+        if "track_features" in pkg.record:
+            pkg.record["track_features"] = ""
 
-    # reset dependencies for nomkl to the blas metapkg and remove any
-    #      track_features (these are attached to the metapkg instead)
-    if name == "nomkl" and not subdir.startswith("win-"):
-        record["depends"] = ["blas * openblas"]
-        if "track_features" in record:
-            record["track_features"] = ""
 
-    if record.get("track_features"):
-        for feat in record["track_features"].split():
+@_hotfix()
+def _fix_track_features(pkg):
+    if pkg.record.get("track_features"):
+        for feat in pkg.record["track_features"].split():
             if feat.startswith(("rb2", "openjdk")):
-                xtractd = record["track_features"] = _extract_track_feature(
-                    record, feat
+                xtractd = pkg.record["track_features"] = _extract_track_feature(
+                    pkg.record, feat
                 )
-                record["track_features"] = xtractd
-
-    #############################################
-    # anaconda, conda, conda-build, constructor #
-    #############################################
-
-    # Remove new shortcut packages from Navigator panel until they are ready
-    if name in [
-        "anconda_prompt",
-        "anaconda_powershell_prompt",
-    ]:
-        if "app_entry" in record:
-            del record["app_entry"]
-        if "app_type" in record:
-            del record["app_type"]
-        if record.get("type") == "app":
-            del record["type"]
+                pkg.record["track_features"] = xtractd
 
-    if (
-        name == "anaconda"
-        and version == "custom"
-        and not any(d.startswith("_anaconda_depends") for d in depends)
-    ):
-        depends.append("_anaconda_depends")
-
-    if name == "anaconda" and version in ["5.3.0", "5.3.1"]:
-        mkl_version = [
-            i for i in depends if i.split()[0] == "mkl" and "2019" in i.split()[1]
-        ]
+
+#############################################
+# anaconda, conda, conda-build, constructor #
+#############################################
+
+# Remove new shortcut packages from Navigator panel until they are ready
+@_hotfix("anconda_prompt", "anaconda_powershell_prompt")
+def _fix_prompt_shortcuts(pkg):
+    if "app_entry" in pkg.record:
+        del pkg.record["app_entry"]
+    if "app_type" in pkg.record:
+        del pkg.record["app_type"]
+    if pkg.record.get("type") == "app":
+        del pkg.record["type"]
+
+
+@_hotfix("anaconda")
+def _fix_anaconda(pkg):
+    version = pkg.version
+    if version == "custom" and not any(d.startswith("_anaconda_depends") for d in pkg.depends):
+        pkg.depends.append("_anaconda_depends")
+
+    if version in ["5.3.0", "5.3.1"]:
+        mkl_version = []
+        for dep in pkg.depends:
+            parts = dep.split()
+            if parts[0] == "mkl" and "2019" in parts[1]:
+                mkl_version.append(dep)
         if len(mkl_version) == 1:
-            depends.remove(mkl_version[0])
-            depends.append("mkl 2018.0.3 1")
+            pkg.depends.remove(mkl_version[0])
+            pkg.depends.append("mkl 2018.0.3 1")
         elif len(mkl_version) > 1:
             raise Exception("Found multiple mkl entries, expected only 1.")
 
-    if name == "conda-build" and version.startswith("3.18"):
-        for i, dep in enumerate(depends):
+
+_VO_3_21_8 = _vo("3.21.8")
+_VO_24_3_0 = _vo("24.3.0")
+_VO_3_28_1 = _vo("3.28.1")
+
+
+@_hotfix("conda-build")
+def _fix_conda_build(pkg):
+    version = pkg.version
+    if version.startswith("3.18"):
+        has_libarchive_c = False
+        for i, dep in enumerate(pkg.depends):
+            if dep == "python-libarchive-c":
+                has_libarchive_c = True
+                continue
             parts = dep.split()
             if parts[0] == "conda" and "4.3" in parts[1]:
-                depends[i] = "conda >=4.5"
+                pkg.depends[i] = "conda >=4.5"
         # CPH 1.5 has a statically linked libarchive and doesn't depend on python-libarchive-c
         #    we were implicitly depending on it, and it goes missing.
-        if "python-libarchive-c" not in depends:
-            depends.append("python-libarchive-c")
-
-    if name == "conda-build":
-        for i, dep in enumerate(depends):
-            dep_name, *other = dep.split()
-            # Jinja 3.0.0 introduced behavior changes that broke certain
-            # conda-build templating functionality.
-            if dep_name == "jinja2":
-                depends[i] = "jinja2 !=3.0.0"
-
+        if not has_libarchive_c:
+            pkg.depends.append("python-libarchive-c")
+
+    for i, dep in enumerate(pkg.depends):
+        # only the first version token is ever used
+        dep_name, *other = dep.split(None, 2)
+        # Jinja 3.0.0 introduced behavior changes that broke certain
+        # conda-build templating functionality.
+        if dep_name == "jinja2":
+            pkg.depends[i] = "jinja2 !=3.0.0"
+
+        elif dep_name == "conda":
             # Deprecation removed in conda 4.13 break older conda-builds
-            if VersionOrder(version) <= VersionOrder("3.21.8") and dep_name == "conda":
-                depends[i] = "{} {}<4.13.0".format(
+            if pkg.version_order <= _VO_3_21_8:
+                pkg.depends[i] = "{} {}<4.13.0".format(
                     dep_name, other[0] + "," if other else ""
                 )
 
             # Deprecations removed in conda 24.3.0 break conda-build <24.3.0.
             # Note that we don't want to affect conda-build <=3.21.8
-            if (
-                dep_name == "conda" and
-                VersionOrder(version) > VersionOrder("3.21.8") and
-                VersionOrder(version) < VersionOrder("24.3.0")
-            ):
-                depends[i] = "{} {}<24.3.0".format(
+            elif pkg.version_order < _VO_24_3_0:
+                pkg.depends[i] = "{} {}<24.3.0".format(
                     dep_name, other[0] + "," if other else ""
                 )
 
-            # Avoid issue on Windows where an old menuinst 1.x is allowed in the environment
-            # and breaks the JSON validation with a failed import
-            if dep_name == "menuinst" and VersionOrder(version) <= VersionOrder("3.28.1"):
-                depends[i] = "menuinst >=2.0.1"
-
-    if name == "constructor":
-        if int(version[0]) < 3:
-            replace_dep(depends, "conda", "conda <4.6.0a0")
-        if VersionOrder("3.2") <= VersionOrder(version) <= VersionOrder("3.3.1"):
-            # Pin nsis on recent versions of constructor
-            # https://github.com/conda/constructor/issues/526
-            replace_dep(depends, "nsis >=3.01", "nsis 3.01")
-        # conda 23.1 broke constructor
-        # https://github.com/conda/constructor/pull/627
-        if record.get("timestamp", 0) <= 1674637311000:
-            replace_dep(depends, "conda >=4.6", "conda >=4.6,<23.1.0a0")
-
-    # libarchive 3.3.2 and 3.3.3 build 0 are missing zstd support.
-    # De-prioritize these packages with a track_feature (via _low_priority)
-    # so they are not installed unless explicitly requested
-    if name == "libarchive" and (
-        version == "3.3.2" or (version == "3.3.3" and build_number == 0)
-    ):
-        depends.append("_low_priority")
-
-    if name == 'anaconda-cloud-auth':
-        if re.match(r'0\.1\.[2-3](?!\d)', version):  # = 0.1.2* or = 0.1.3*
-            bisect.insort_left(depends, 'jaraco.classes =3')
-
-    # In anaconda-cli-base 0.3.0 the plugin structure changed and this package
-    # is no longer utilized. Updating pins here to avoid this package being installed
-    # alongside the new plugin implementation.
-    if name == 'anaconda-cloud-cli':
-        if re.match(r'0\.1\.0(?!\d)', version):  # = 0.1.0*
-            replace_dep(depends, 'anaconda-cli-base', 'anaconda-cli-base <0.3.0')
-            replace_dep(depends, 'anaconda-cloud-auth', 'anaconda-cloud-auth <0.6.0')
-        if re.match(r'0\.2\.0(?!\d)', version):  # = 0.2.0*
-            replace_dep(depends, 'anaconda-cli-base >=0.2', 'anaconda-cli-base >=0.2,<0.3')
-            replace_dep(depends, 'anaconda-cloud-auth >=0.3', 'anaconda-cloud-auth >=0.3,<0.6')
-            replace_dep(depends, 'anaconda-client >=1.12.2', 'anaconda-client >=1.12.2,<1.13')
-
-    if name == 'anaconda-client':
-        if re.match(r'1\.(?:\d|1[01])\.', version):  # < 1.12.0
-            if replace_dep(depends, 'urllib3 >=1.26.4', 'urllib3 >=1.26.4,<2.0.0a') == '=':  # if no changes
-                depends.append('urllib3 <2.0.0a')
-
-    if name == 'anaconda-navigator':
-        if re.match(r'1\.|2\.[0-2]\.', version):  # < 2.3.0
-            replace_dep(depends, ['pyqt >=5.6,<6.0a0', 'pyqt >=5.6', 'pyqt'], 'pyqt >=5.6,<5.15')
-
-        if re.match(r'1\.|2\.[0-3]\.', version):  # < 2.4.0
-            replace_dep(depends, 'conda', 'conda <22.11.0', append=True)
-
-        if version.startswith('2.4.0'):  # = 2.4.0*
-            replace_dep(depends, ['conda', 'conda !=22.11.*'], 'conda <23.5.0,!=22.11.*')
-
-        if re.match(r'2\.4\.[1-3](?!\d)', version):  # = 2.4.1* or = 2.4.2* or = 2.4.3*
-            replace_dep(
-                depends,
-                ['conda', 'conda !=22.11.*', 'conda !=22.11.*,!=23.7.0,!=23.7.1'],
-                'conda !=22.11.*,!=23.7.0,!=23.7.1,!=23.7.2,!=23.7.3',
-            )
-
-    if ((name in ('aext-assistant-server', 'aext-shared', 'anaconda-toolbox') and
-            VersionOrder(version) <= VersionOrder("4.0.15")) or
-            (name == 'anaconda-navigator' and VersionOrder(version) <= VersionOrder("2.6.3"))):
-        replace_dep(depends, 'anaconda-cloud-auth', 'anaconda-cloud-auth <0.7.0')
-        replace_dep(depends, 'anaconda-cloud-auth >=0.1.3', 'anaconda-cloud-auth >=0.1.3,<0.7.0')
-        replace_dep(depends, 'anaconda-cloud-auth >=0.4.1', 'anaconda-cloud-auth >=0.4.1,<0.7.0')
-
-    if name == "conda-content-trust" and VersionOrder(version) <= VersionOrder("0.1.3"):
-        replace_dep(depends, "cryptography", "cryptography <41.0.0a0")
-
-    ########################
-    # run_exports mis-pins #
-    ########################
+        # Avoid issue on Windows where an old menuinst 1.x is allowed in the environment
+        # and breaks the JSON validation with a failed import
+        elif dep_name == "menuinst" and pkg.version_order <= _VO_3_28_1:
+            pkg.depends[i] = "menuinst >=2.0.1"
+
+
+_VO_3_2 = _vo("3.2")
+_VO_3_3_1 = _vo("3.3.1")
+
+
+@_hotfix("constructor")
+def _fix_constructor(pkg):
+    version = pkg.version
+    if int(version[0]) < 3:
+        replace_dep(pkg.depends, "conda", "conda <4.6.0a0")
+    if _VO_3_2 <= pkg.version_order <= _VO_3_3_1:
+        # Pin nsis on recent versions of constructor
+        # https://github.com/conda/constructor/issues/526
+        replace_dep(pkg.depends, "nsis >=3.01", "nsis 3.01")
+    # conda 23.1 broke constructor
+    # https://github.com/conda/constructor/pull/627
+    if pkg.record.get("timestamp", 0) <= 1674637311000:
+        replace_dep(pkg.depends, "conda >=4.6", "conda >=4.6,<23.1.0a0")
+
+
+# libarchive 3.3.2 and 3.3.3 build 0 are missing zstd support.
+# De-prioritize these packages with a track_feature (via _low_priority)
+# so they are not installed unless explicitly requested
+@_hotfix("libarchive")
+def _fix_libarchive(pkg):
+    version = pkg.version
+    if version == "3.3.2" or (version == "3.3.3" and pkg.build_number == 0):
+        pkg.depends.append("_low_priority")
+
+
+_CLOUD_AUTH_0_1_2_RE = re.compile(r'0\.1\.[2-3](?!\d)')  # = 0.1.2* or = 0.1.3*
+
+
+@_hotfix('anaconda-cloud-auth')
+def _fix_anaconda_cloud_auth(pkg):
+    if _CLOUD_AUTH_0_1_2_RE.match(pkg.version):
+        # insert in place like replace_dep does, appending and re-sorting would reorder the rest of depends
+        bisect.insort_left(pkg.depends, 'jaraco.classes =3')
+
+
+# In anaconda-cli-base 0.3.0 the plugin structure changed and this package
+# is no longer utilized. Updating pins here to avoid this package being installed
+# alongside the new plugin implementation.
+_CLOUD_CLI_0_1_0_RE = re.compile(r'0\.1\.0(?!\d)')  # = 0.1.0*
+_CLOUD_CLI_0_2_0_RE = re.compile(r'0\.2\.0(?!\d)')  # = 0.2.0*
+
+
+@_hotfix('anaconda-cloud-cli')
+def _fix_anaconda_cloud_cli(pkg):
+    version = pkg.version
+    if _CLOUD_CLI_0_1_0_RE.match(version):
+        replace_dep(pkg.depends, 'anaconda-cli-base', 'anaconda-cli-base <0.3.0')
+        replace_dep(pkg.depends, 'anaconda-cloud-auth', 'anaconda-cloud-auth <0.6.0')
+    if _CLOUD_CLI_0_2_0_RE.match(version):
+        replace_dep(pkg.depends, 'anaconda-cli-base >=0.2', 'anaconda-cli-base >=0.2,<0.3')
+        replace_dep(pkg.depends, 'anaconda-cloud-auth >=0.3', 'anaconda-cloud-auth >=0.3,<0.6')
+        replace_dep(pkg.depends, 'anaconda-client >=1.12.2', 'anaconda-client >=1.12.2,<1.13')
+
+
+_CLIENT_LT_1_12_RE = re.compile(r'1\.(?:\d|1[01])\.')  # < 1.12.0
+
+
+@_hotfix('anaconda-client')
+def _fix_anaconda_client(pkg):
+    if _CLIENT_LT_1_12_RE.match(pkg.version):
+        if replace_dep(pkg.depends, 'urllib3 >=1.26.4', 'urllib3 >=1.26.4,<2.0.0a') == '=':  # if no changes
+            pkg.depends.append('urllib3 <2.0.0a')
+
+
+_NAVIGATOR_LT_2_3_RE = re.compile(r'1\.|2\.[0-2]\.')  # < 2.3.0
+_NAVIGATOR_LT_2_4_RE = re.compile(r'1\.|2\.[0-3]\.')  # < 2.4.0
+_NAVIGATOR_2_4_1_RE = re.compile(r'2\.4\.[1-3](?!\d)')  # = 2.4.1* or = 2.4.2* or = 2.4.3*
+
+
+@_hotfix('anaconda-navigator')
+def _fix_anaconda_navigator(pkg):
+    version = pkg.version
+    if _NAVIGATOR_LT_2_3_RE.match(version):
+        replace_dep(pkg.depends, ['pyqt >=5.6,<6.0a0', 'pyqt >=5.6', 'pyqt'], 'pyqt >=5.6,<5.15')
+
+    if _NAVIGATOR_LT_2_4_RE.match(version):
+        replace_dep(pkg.depends, 'conda', 'conda <22.11.0', append=True)
+
+    if version.startswith('2.4.0'):  # = 2.4.0*
+        replace_dep(pkg.depends, ['conda', 'conda !=22.11.*'], 'conda <23.5.0,!=22.11.*')
+
+    if _NAVIGATOR_2_4_1_RE.match(version):
+        replace_dep(
+            pkg.depends,
+            ['conda', 'conda !=22.11.*', 'conda !=22.11.*,!=23.7.0,!=23.7.1'],
+            'conda !=22.11.*,!=23.7.0,!=23.7.1,!=23.7.2,!=23.7.3',
+        )
+
+
+_AEXT_PKGS = frozenset(('aext-assistant-server', 'aext-shared', 'anaconda-toolbox'))
+_CLOUD_AUTH_LT_0_7_PINS = {
+    'anaconda-cloud-auth': 'anaconda-cloud-auth <0.7.0',
+    'anaconda-cloud-auth >=0.1.3': 'anaconda-cloud-auth >=0.1.3,<0.7.0',
+    'anaconda-cloud-auth >=0.4.1': 'anaconda-cloud-auth >=0.4.1,<0.7.0',
+}
+
+
+_VO_4_0_15 = _vo("4.0.15")
+_VO_2_6_3 = _vo("2.6.3")
 
-    # openssl 1.1.1 uses funnny version numbers, 1.1.1, 1.1.1a, 1.1.1b, etc
-    # openssl >=1.1.1,<1.1.2.0a0 -> >=1.1.1a,<1.1.2a
-    replace_dep(depends, "openssl >=1.1.1,<1.1.2.0a0", "openssl >=1.1.1a,<1.1.2a")
 
+@_hotfix(*_AEXT_PKGS, 'anaconda-navigator')
+def _fix_anaconda_cloud_auth_pins(pkg):
+    name = pkg.name
+    if ((name in _AEXT_PKGS and
+            pkg.version_order <= _VO_4_0_15) or
+            (name == 'anaconda-navigator' and pkg.version_order <= _VO_2_6_3)):
+        replace_deps(pkg.depends, _CLOUD_AUTH_LT_0_7_PINS)
+
+
+_VO_0_1_3 = _vo("0.1.3")
+
+
+@_hotfix("conda-content-trust")
+def _fix_conda_content_trust(pkg):
+    if pkg.version_order <= _VO_0_1_3:
+        replace_dep(pkg.depends, "cryptography", "cryptography <41.0.0a0")
+
+
+########################
+# run_exports mis-pins #
+########################
+
+# exact depends that _fix_run_exports rewrites, so it can look them all up in one pass
+_RUN_EXPORTS_DEPS = frozenset(map(sys.intern, (
+    "openssl >=1.1.1,<1.1.2.0a0",
+    "openssl !=1.1.1e",
+    "openssl",
+    "kealib >=1.4.7,<1.5.0a0",
+    "libffi >=3.2.1,<4.0a0",
+    "libffi",
+    "libnetcdf >=4.6.1,<5.0a0",
+    "zeromq >=4.3.1,<4.4.0a0",
+)))
+_RUN_EXPORTS_PREFIXES = ("glib >=", "zstd >=1.4.", "libcurl >=7.", "curl >=7.")
+
+
+@_hotfix()
+def _fix_run_exports(pkg):
     # openssl3 preventive measures
-    replace_dep(depends, "openssl !=1.1.1e", "openssl !=1.1.1e,<1.1.2a")
-    replace_dep(constrains, "openssl !=1.1.1e", "openssl !=1.1.1e,<1.1.2a")
-    replace_dep(constrains, "openssl >=1.1.1k", "openssl >=1.1.1k,<1.1.2a")
-    if name != "_anaconda_depends":
-        replace_dep(depends, "openssl", "openssl <1.1.2a")
+    replace_dep(pkg.constrains, "openssl !=1.1.1e", "openssl !=1.1.1e,<1.1.2a")
+    replace_dep(pkg.constrains, "openssl >=1.1.1k", "openssl >=1.1.1k,<1.1.2a")
+
+    # none of the rewrites below produce one of these deps, so this holds for the whole hotfix
+    present = _RUN_EXPORTS_DEPS.intersection(pkg.depends)
+    prefixed = [i for i, dep in enumerate(pkg.depends) if dep.startswith(_RUN_EXPORTS_PREFIXES)]
+    if not (present or prefixed):
+        return
+
+    # Broad replacements. These only rewrite in place and the prefixes never sort differently against
+    # the openssl/kealib deps inserted below, so doing them first doesn't change the result. The same
+    # handful of rewritten pins shows up across thousands of records, so share one string for each.
+    for i in prefixed:
+        dep = pkg.depends[i]
 
-    # kealib 1.4.8 changed sonames, add new upper bound to existing packages
-    replace_dep(depends, "kealib >=1.4.7,<1.5.0a0", "kealib >=1.4.7,<1.4.8.0a0")
-    # Other broad replacements
-    for i, dep in enumerate(depends):
         # glib is compatible up to the major version
         if dep.startswith("glib >="):
-            depends[i] = dep.split(",")[0] + ",<3.0a0"
+            pkg.depends[i] = sys.intern(dep.partition(",")[0] + ",<3.0a0")
 
         # zstd has been more or less ABI compatible in the 1.4.x releases.
         # `ZSTD_getSequences` is the only symbol reported as being removed
         # between 1.4.0 and 1.5.0, but as far as we can tell, none of our
         # (linux-64) packages actually use it.
-        if dep.startswith("zstd >=1.4."):
-            depends[i] = dep.split(",")[0] + ",<1.5.0a0"
+        elif dep.startswith("zstd >=1.4."):
+            pkg.depends[i] = sys.intern(dep.partition(",")[0] + ",<1.5.0a0")
 
         # curl >=8.0.0 is not actually a major upgrade
-        if dep.startswith("libcurl >=7.") or dep.startswith("curl >=7."):
-            depends[i] = dep.split(",")[0] + ",<9.0a0"
+        elif dep.startswith(("libcurl >=7.", "curl >=7.")):
+            pkg.depends[i] = sys.intern(dep.partition(",")[0] + ",<9.0a0")
+
+    # openssl 1.1.1 uses funnny version numbers, 1.1.1, 1.1.1a, 1.1.1b, etc
+    # openssl >=1.1.1,<1.1.2.0a0 -> >=1.1.1a,<1.1.2a
+    if "openssl >=1.1.1,<1.1.2.0a0" in present:
+        replace_dep(pkg.depends, "openssl >=1.1.1,<1.1.2.0a0", "openssl >=1.1.1a,<1.1.2a")
+
+    # openssl3 preventive measures
+    if "openssl !=1.1.1e" in present:
+        replace_dep(pkg.depends, "openssl !=1.1.1e", "openssl !=1.1.1e,<1.1.2a")
+    if "openssl" in present and pkg.name != "_anaconda_depends":
+        replace_dep(pkg.depends, "openssl", "openssl <1.1.2a")
+
+    # kealib 1.4.8 changed sonames, add new upper bound to existing packages
+    if "kealib >=1.4.7,<1.5.0a0" in present:
+        replace_dep(pkg.depends, "kealib >=1.4.7,<1.5.0a0", "kealib >=1.4.7,<1.4.8.0a0")
 
     # libffi broke ABI compatibility in 3.3
-    if name not in LIBFFI_HOTFIX_EXCLUDES and (
-        "libffi >=3.2.1,<4.0a0" in depends or "libffi" in depends
-    ):
-        if "libffi >=3.2.1,<4.0a0" in depends:
-            libffi_idx = depends.index("libffi >=3.2.1,<4.0a0")
+    if (
+        "libffi >=3.2.1,<4.0a0" in present or "libffi" in present
+    ) and pkg.name not in LIBFFI_HOTFIX_EXCLUDES:
+        if "libffi >=3.2.1,<4.0a0" in present:
+            libffi_idx = pkg.depends.index("libffi >=3.2.1,<4.0a0")
         else:
-            libffi_idx = depends.index("libffi")
-        depends[libffi_idx] = "libffi >=3.2.1,<3.3a0"
+            libffi_idx = pkg.depends.index("libffi")
+        pkg.depends[libffi_idx] = "libffi >=3.2.1,<3.3a0"
 
-    replace_dep(depends, "libnetcdf >=4.6.1,<5.0a0", "libnetcdf >=4.6.1,<4.7.0a0")
+    if "libnetcdf >=4.6.1,<5.0a0" in present:
+        replace_dep(pkg.depends, "libnetcdf >=4.6.1,<5.0a0", "libnetcdf >=4.6.1,<4.7.0a0")
 
     # ZeroMQ DLL includes patch number in DLL name, which limits the upper bound
-    if subdir.startswith("win-"):
-        replace_dep(depends, "zeromq >=4.3.1,<4.4.0a0", "zeromq >=4.3.1,<4.3.2.0a0")
+    if "zeromq >=4.3.1,<4.4.0a0" in present and pkg.is_win:
+        replace_dep(pkg.depends, "zeromq >=4.3.1,<4.4.0a0", "zeromq >=4.3.1,<4.3.2.0a0")
+
 
-    ##########################
-    # single package depends #
-    ##########################
+##########################
+# single package depends #
+##########################
 
-    # https://github.com/ContinuumIO/anaconda-issues/issues/11315
-    if subdir.startswith("win") and name == "jupyterlab" and "pywin32" not in depends:
-        depends.append("pywin32")
+# https://github.com/ContinuumIO/anaconda-issues/issues/11315
+@_hotfix("jupyterlab")
+def _fix_jupyterlab(pkg):
+    if pkg.is_win and "pywin32" not in pkg.depends:
+        pkg.depends.append("pywin32")
 
+
+@_hotfix("pyqt")
+def _fix_pyqt(pkg):
     # pyqt needs an upper limit of sip, build 2 has this already
-    if name == "pyqt" and version == "5.9.2":
-        replace_dep(depends, "sip >=4.19.4", "sip >=4.19.4,<=4.19.8")
+    if pkg.version == "5.9.2":
+        replace_dep(pkg.depends, "sip >=4.19.4", "sip >=4.19.4,<=4.19.8")
 
     # three pyqt packages were built against sip 4.19.13
     # first filename is linux-64, second is win-64 and win-32
-    if fn in ["pyqt-5.9.2-py38h05f1152_4.tar.bz2", "pyqt-5.9.2-py38ha925a31_4.tar.bz2"]:
-        sip_index = [dep.startswith("sip") for dep in depends].index(True)
-        depends[sip_index] = "sip >=4.19.13,<=4.19.14"
+    if pkg.fn in ["pyqt-5.9.2-py38h05f1152_4.tar.bz2", "pyqt-5.9.2-py38ha925a31_4.tar.bz2"]:
+        sip_index = next(i for i, dep in enumerate(pkg.depends) if dep.startswith("sip"))
+        pkg.depends[sip_index] = "sip >=4.19.13,<=4.19.14"
+
 
-    if fn == "dask-2.7.0-py_0.tar.bz2":
-        for i, dep in enumerate(depends):
+@_hotfix("dask")
+def _fix_dask(pkg):
+    if pkg.fn == "dask-2.7.0-py_0.tar.bz2":
+        for i, dep in enumerate(pkg.depends):
             if dep.startswith("python "):
-                depends[i] = "python >=3.6"
+                pkg.depends[i] = "python >=3.6"
+
+    if pkg.version == "2021.3.1" and pkg.build_number == 0:
+        pkg.depends[:] = ["python >=3.7", "numpy >=1.16"] + [
+            d
+            for d in pkg.depends
+            if d.partition(" ")[0]
+            not in {"python", "cloudpickle", "fsspec", "numpy", "partd", "toolz"}
+        ]
+        pkg.depends.sort()
+
 
-    if fn == "dask-core-2.7.0-py_0.tar.bz2":
-        depends[:] = ["python >=3.6"]
+@_hotfix("dask-core")
+def _fix_dask_core(pkg):
+    if pkg.fn == "dask-core-2.7.0-py_0.tar.bz2":
+        pkg.depends[:] = ["python >=3.6"]
 
-    if name == "dask-core" and version == "2021.3.1" and build_number == 0:
-        depends[:] = [
+    if pkg.version == "2021.3.1" and pkg.build_number == 0:
+        pkg.depends[:] = [
             "python >=3.7",
             "cloudpickle >=1.1.1",
             "fsspec >=0.6.0",
@@ -1110,437 +1527,651 @@ def patch_record_in_place(fn, record, subdir):
             "pyyaml",
             "toolz >=0.8.2",
         ]
-    if name == "dask" and version == "2021.3.1" and build_number == 0:
-        depends[:] = ["python >=3.7", "numpy >=1.16"] + [
-            d
-            for d in depends
-            if d.split(" ")[0]
-            not in ("python", "cloudpickle", "fsspec", "numpy", "partd", "toolz")
-        ]
-        depends.sort()
 
+
+_VO_0_20_5 = _vo("0.20.5")
+
+
+@_hotfix("sparkmagic")
+def _fix_sparkmagic(pkg):
+    version = pkg.version
     # sparkmagic <=0.12.7 has issues with ipykernel >4.10
     # see: https://github.com/AnacondaRecipes/sparkmagic-feedstock/pull/3
-    if name == "sparkmagic" and version in ["0.12.1", "0.12.5", "0.12.6", "0.12.7"]:
-        replace_dep(depends, "ipykernel >=4.2.2", "ipykernel >=4.2.2,<4.10.0")
+    if version in ["0.12.1", "0.12.5", "0.12.6", "0.12.7"]:
+        replace_dep(pkg.depends, "ipykernel >=4.2.2", "ipykernel >=4.2.2,<4.10.0")
 
     # sparmagic has issues with pandas >=2
     # see: https://github.com/jupyter-incubator/sparkmagic/pull/812
-    if name == "sparkmagic" and VersionOrder(version) < VersionOrder("0.20.5"):
-        replace_dep(depends, "pandas >=0.17.1", "pandas >=0.17.1,<2.0.0")
-
-    # notebook <5.7.6 will not work with tornado 6, see:
-    # https://github.com/jupyter/notebook/issues/4439
-    # notebook <7 will not work with pyzmq>=25 and jupyter_client>=8, see:
-    # https://github.com/jupyter/notebook/pull/6749
-    if name == "notebook":
-        replace_dep(depends, "tornado >=4", "tornado >=4,<6")
-        if int(version.split('.', 1)[0]) < 7:
-            replace_dep(depends, "pyzmq >=17", "pyzmq >=17,<25")
-            replace_dep(depends, "jupyter_client >=5.3.4", "jupyter_client >=5.3.4,<8")
-            replace_dep(depends, "jupyter_client >=5.2.0", "jupyter_client >=5.2.0,<8")
-            replace_dep(depends, "jupyter_client", "jupyter_client <8")
-
-    # no cross-compatibility possible between Notebook 6 and 7 extensions
-    if name == "nb_conda" and VersionOrder(version) <= VersionOrder("2.2.1"):
-        replace_dep(depends, "notebook >=4.3.1", "notebook >=4.3.1,<7")
-    if name == "nb_conda_kernels" and VersionOrder(version) <= VersionOrder("2.3.1"):
-        replace_dep(depends, "notebook >=4.2.0", "notebook >=4.2.0,<7")
-
-    # requests-toolbelt<1.0.0 does not support urllib3>=2.0.0 (which is an indirect dependency)
-    # issue: https://github.com/Anaconda-Platform/anaconda-client/issues/654#issuecomment-1655089483
-    if (name == 'requests-toolbelt') and version.startswith('0.'):
-        depends.append('urllib3 <2.0.0a')
+    if pkg.version_order < _VO_0_20_5:
+        replace_dep(pkg.depends, "pandas >=0.17.1", "pandas >=0.17.1,<2.0.0")
+
+
+# notebook <5.7.6 will not work with tornado 6, see:
+# https://github.com/jupyter/notebook/issues/4439
+# notebook <7 will not work with pyzmq>=25 and jupyter_client>=8, see:
+# https://github.com/jupyter/notebook/pull/6749
+_NOTEBOOK_LT_7_PINS = {
+    "pyzmq >=17": "pyzmq >=17,<25",
+    "jupyter_client >=5.3.4": "jupyter_client >=5.3.4,<8",
+    "jupyter_client >=5.2.0": "jupyter_client >=5.2.0,<8",
+    "jupyter_client": "jupyter_client <8",
+}
+
 
+@_hotfix("notebook")
+def _fix_notebook(pkg):
+    replace_dep(pkg.depends, "tornado >=4", "tornado >=4,<6")
+    if int(pkg.version.partition('.')[0]) < 7:
+        replace_deps(pkg.depends, _NOTEBOOK_LT_7_PINS)
+
+
+_VO_2_2_1 = _vo("2.2.1")
+
+
+# no cross-compatibility possible between Notebook 6 and 7 extensions
+@_hotfix("nb_conda")
+def _fix_nb_conda(pkg):
+    if pkg.version_order <= _VO_2_2_1:
+        replace_dep(pkg.depends, "notebook >=4.3.1", "notebook >=4.3.1,<7")
+
+
+_VO_2_3_1 = _vo("2.3.1")
+
+
+@_hotfix("nb_conda_kernels")
+def _fix_nb_conda_kernels(pkg):
+    if pkg.version_order <= _VO_2_3_1:
+        replace_dep(pkg.depends, "notebook >=4.2.0", "notebook >=4.2.0,<7")
+
+
+# requests-toolbelt<1.0.0 does not support urllib3>=2.0.0 (which is an indirect dependency)
+# issue: https://github.com/Anaconda-Platform/anaconda-client/issues/654#issuecomment-1655089483
+@_hotfix('requests-toolbelt')
+def _fix_requests_toolbelt(pkg):
+    if pkg.version.startswith('0.'):
+        pkg.depends.append('urllib3 <2.0.0a')
+
+
+@_hotfix("spyder")
+def _fix_spyder(pkg):
+    version = pkg.version
     # spyder 4.0.0 and 4.0.1 should include a lower bound on psutil of 5.2
     # and should pin parso to 0.5.2.
     # https://github.com/conda-forge/spyder-feedstock/pull/73
     # https://github.com/conda-forge/spyder-feedstock/pull/74
-    if name == "spyder" and version in ["4.0.0", "4.0.1"]:
+    if version in ["4.0.0", "4.0.1"]:
         add_parso_dep = True
-        for idx, dep in enumerate(depends):
+        for idx, dep in enumerate(pkg.depends):
             if dep.startswith("parso"):
                 add_parso_dep = False
-            if dep.startswith("psutil"):
-                depends[idx] = "psutil >=5.2"
+            elif dep.startswith("psutil"):
+                pkg.depends[idx] = "psutil >=5.2"
             # spyder-kernels needs to be pinned to <=1.9.0, see:
             # https://github.com/conda-forge/spyder-feedstock/pull/76
-            if dep.startswith("spyder-kernels"):
-                depends[idx] = "spyder-kernels >=1.8.1,<1.9.0"
+            elif dep.startswith("spyder-kernels"):
+                pkg.depends[idx] = "spyder-kernels >=1.8.1,<1.9.0"
         if add_parso_dep:
-            depends.append("parso 0.5.2.*")
+            pkg.depends.append("parso 0.5.2.*")
 
     #  spyder 4.2.4 should have an upper bound on qdarkstyle and requires a newer qtconsole.
-    if name == "spyder" and version == "4.2.4":
-        replace_dep(depends, "qdarkstyle >=2.8", "qdarkstyle >=2.8,<3.0")
-        replace_dep(depends, "qtconsole >=5.0.1", "qtconsole >=5.0.3")
+    if version == "4.2.4":
+        replace_dep(pkg.depends, "qdarkstyle >=2.8", "qdarkstyle >=2.8,<3.0")
+        replace_dep(pkg.depends, "qtconsole >=5.0.1", "qtconsole >=5.0.3")
 
     # spyder 5.0 new dependencies were not properly captured in our recipe
-    if name == "spyder-kernels" and version == "2.0.1":
-        replace_dep(depends, "ipykernel >=5.1.3", "ipykernel >=5.3.0")
-    if name == "spyder" and version == "5.0.0":
-        replace_dep(depends, "qdarkstyle >=2.8,<3.0", "qdarkstyle 3.0.2.*")
+    if version == "5.0.0":
+        replace_dep(pkg.depends, "qdarkstyle >=2.8,<3.0", "qdarkstyle 3.0.2.*")
         replace_dep(
-            depends, "spyder-kernels >=1.10.2,<1.11.0", "spyder-kernels >=2.0.1,<2.1.0"
+            pkg.depends, "spyder-kernels >=1.10.2,<1.11.0", "spyder-kernels >=2.0.1,<2.1.0"
         )
-        depends.append("qstylizer >=0.1.10")
-        depends.append("cookiecutter >=1.6.0")
-        depends.sort()
+        pkg.depends.append("qstylizer >=0.1.10")
+        pkg.depends.append("cookiecutter >=1.6.0")
+        pkg.depends.sort()
+
+
+@_hotfix("spyder-kernels")
+def _fix_spyder_kernels(pkg):
+    if pkg.version == "2.0.1":
+        replace_dep(pkg.depends, "ipykernel >=5.1.3", "ipykernel >=5.3.0")
 
+
+@_hotfix("ipython")
+def _fix_ipython(pkg):
     # IPython >=7,<7.10 should have an upper bound on prompt_toolkit
-    if name == "ipython" and version.startswith("7."):
-        replace_dep(depends, "prompt_toolkit >=2.0.0", "prompt_toolkit >=2.0.0,<3")
+    if pkg.version.startswith("7."):
+        replace_dep(pkg.depends, "prompt_toolkit >=2.0.0", "prompt_toolkit >=2.0.0,<3")
 
     # IPython has an upper bound on jedi; see conda-forge/ipython-feedstock#127
-    if name == "ipython":
-        replace_dep(depends, "jedi >=0.10", "jedi >=0.10,<0.18")
+    replace_dep(pkg.depends, "jedi >=0.10", "jedi >=0.10,<0.18")
+
+
+# jupyter_console 5.2.0 has bounded dependency on prompt_toolkit
+@_hotfix("jupyter_console")
+def _fix_jupyter_console(pkg):
+    if pkg.version == "5.2.0":
+        replace_dep(pkg.depends, "prompt_toolkit", "prompt_toolkit >=1.0.0,<2")
+
 
-    # jupyter_console 5.2.0 has bounded dependency on prompt_toolkit
-    if name == "jupyter_console" and version == "5.2.0":
-        replace_dep(depends, "prompt_toolkit", "prompt_toolkit >=1.0.0,<2")
+# jupyter_client 6.0.0 should have lower bound of 3.5 on python
+@_hotfix("jupyter_client")
+def _fix_jupyter_client(pkg):
+    if pkg.version == "6.0.0":
+        replace_dep(pkg.depends, "python", "python >=3.5")
 
-    # jupyter_client 6.0.0 should have lower bound of 3.5 on python
-    if name == "jupyter_client" and version == "6.0.0":
-        replace_dep(depends, "python", "python >=3.5")
 
+@_hotfix("numba")
+def _fix_numba(pkg):
+    version = pkg.version
     # numba 0.46.0 and 0.47.0 are missing a dependency on setuptools
     # https://github.com/numba/numba/issues/5134
-    if name == "numba" and version in ["0.46.0", "0.47.0"]:
-        depends.append("setuptools")
+    if version in ["0.46.0", "0.47.0"]:
+        pkg.depends.append("setuptools")
 
     # numba 0.54.0 0.54.1 0.55.0 have the wrong numpy bounds set
     # see https://github.com/numba/numba/blob/0.54.0/numba/__init__.py#L135
     # see https://github.com/numba/numba/blob/0.54.1/numba/__init__.py#L135
     # see https://github.com/numba/numba/blob/0.55.0/numba/__init__.py#L137
-    if name == "numba" and version in ("0.54.0", "0.54.1"):
-        record["constrains"] = ["numpy >=1.17,<1.21.0a0"]
-    if name == "numba" and version == "0.55.0":
-        record["constrains"] = ["numpy >=1.18,<1.22.0a0"]
-
-    # python-language-server should contrains ujson <=1.35
-    # see https://github.com/conda-forge/cf-mark-broken/pull/20
-    # https://github.com/conda-forge/python-language-server-feedstock/pull/48
-    if name == "python-language-server" and version in ["0.31.2", "0.31.7"]:
-        replace_dep(depends, "ujson", "ujson <=1.35")
-
-    # pylint 2.5.0 build 0 had incorrect astroid pinning and were missing a
-    # dependency on toml >=0.7.1
-    if name == "pylint" and version == "2.5.0" and build_number == 0:
-        replace_dep(depends, "astroid >=2.3.0,<2.4", "astroid >=2.4.0,<2.5")
-        if "toml >=0.7.1" not in depends:
-            depends.append("toml >=0.7.1")
-
+    if version in ("0.54.0", "0.54.1"):
+        pkg.record["constrains"] = ["numpy >=1.17,<1.21.0a0"]
+    if version == "0.55.0":
+        pkg.record["constrains"] = ["numpy >=1.18,<1.22.0a0"]
+
+
+# python-language-server should contrains ujson <=1.35
+# see https://github.com/conda-forge/cf-mark-broken/pull/20
+# https://github.com/conda-forge/python-language-server-feedstock/pull/48
+@_hotfix("python-language-server")
+def _fix_python_language_server(pkg):
+    if pkg.version in ["0.31.2", "0.31.7"]:
+        replace_dep(pkg.depends, "ujson", "ujson <=1.35")
+
+
+# pylint 2.5.0 build 0 had incorrect astroid pinning and were missing a
+# dependency on toml >=0.7.1
+@_hotfix("pylint")
+def _fix_pylint(pkg):
+    if pkg.version == "2.5.0" and pkg.build_number == 0:
+        replace_dep(pkg.depends, "astroid >=2.3.0,<2.4", "astroid >=2.4.0,<2.5")
+        if "toml >=0.7.1" not in pkg.depends:
+            pkg.depends.append("toml >=0.7.1")
+
+
+@_hotfix("flask")
+def _fix_flask(pkg):
+    version = pkg.version
     # flask <1.0 should pin werkzeug to <1.0.0
-    if name == "flask" and version[0] == "0":
-        replace_dep(depends, "werkzeug", "werkzeug <1.0.0")
-        replace_dep(depends, "werkzeug >=0.7", "werkzeug >=0.7,<1.0.0")
+    if version[0] == "0":
+        replace_dep(pkg.depends, "werkzeug", "werkzeug <1.0.0")
+        replace_dep(pkg.depends, "werkzeug >=0.7", "werkzeug >=0.7,<1.0.0")
 
     # if flask is 1.x is not compatible with the newest versions of
     # some dependencies. Hotfix to pin according to pinnings in v1.1.4:
     # https://github.com/pallets/flask/blob/1.1.4/setup.py#L55-L60
     # Version 1.1.4 will be maintained in a separate branch:
     # https://github.com/AnacondaRecipes/flask-feedstock/tree/main-1.1.x
-    if name == "flask" and version[0] == "1" and int(version[-1]) < 4:
+    if version[0] == "1" and int(version[-1]) < 4:
         # the two next lines are commented as they break older anaconda distributions (2022.05)
         # replace_dep(depends, "click >=5.1", "click >=5.1,<8.0")
         # replace_dep(depends, "itsdangerous >=0.24", "itsdangerous >=0.24,<2.0")
-        replace_dep(depends, "jinja2 >=2.10.1", "jinja2 >=2.10.1,<3.0")
-        replace_dep(depends, "jinja2 >=2.10", "jinja2 >=2.10,<3.0")
-        replace_dep(depends, "werkzeug >=0.14", "werkzeug >=0.15,<2.0")
-
-    # package found the freetype library in the build enviroment rather than
-    # host but used the host run_export: freetype >=2.9.1,<3.0a0
-    if subdir == "osx-64" and fn == "harfbuzz-2.4.0-h831d699_0.tar.bz2":
-        replace_dep(depends, "freetype >=2.9.1,<3.0a0", "freetype >=2.10.2,<3.0a0")
-
-    # sympy 1.6 and 1.6.1 are missing fastcache and gmpy2 depends
-    if name == "sympy" and version in ["1.6", "1.6.1"]:
-        depends.append("fastcache")
-        depends.append("gmpy2 >=2.0.8")
-
-    if name == "pytest-openfiles" and version == "0.5.0":
-        depends[:] = ["psutil", "pytest >=4.6", "python >=3.6"]
-
-    if name == "pytest-doctestplus" and version == "0.7.0":
-        depends[:] = ["numpy >=1.10", "pytest >=4.0", "python >=3.6"]
-
-    # astropy 4.2 bumped the minimum version of numpy required; the recipe was
-    # updated to reflect this, but older 4.2 build need their metadata patched.
-    if name == "astropy" and version == "4.2":
-        depends[:] = [d for d in depends if not d.startswith("numpy ")]
-        depends.append("numpy >=1.17.0,<2.0a0")
-        depends.sort()
-
-    # some builds of gitpyhon 3.1.17 list the wrong dependencies
-    if name == "gitpython" and version in ("3.1.17", "3.1.18"):
-        depends[:] = ["gitdb >=4.0.1,<5", "python >=3.5", "typing-extensions >=3.7.4.0"]
-
-    # click >=8.0 is actually Python 3.6+
-    if name == "click" and int(version.split(".", 1)[0]) >= 8:
-        replace_dep(depends, "python", "python >=3.6")
-
-    # click-repl <0.2.0 incompatible with click >=8.0
-    # See: https://github.com/click-contrib/click-repl/pull/76
-    if name == "click-repl" and version.startswith("0.1."):
-        replace_dep(depends, "click", "click <8.0")
-
-    # tifffile 2021.3.31 requires Python >=3.7, imagecodecs >=2021.3.31
-    if name == "tifffile" and version == "2021.3.31":
-        replace_dep(depends, "python >=3.6", "python >=3.7")
-        replace_dep(depends, "imagecodecs", "imagecodecs >=2021.3.31")
-
-    # Panel<0.11.0 requires Bokeh<2.3
-    if name == "panel":
-        ver_parts = version.split(".")
-        if int(ver_parts[0]) == 0 and int(ver_parts[1]) < 11:
-            for i, dep in enumerate(depends):
-                if dep.startswith("bokeh >=2."):
-                    depends[i] = dep.split(",")[0] + ",<2.3"
-                if dep.startswith("bokeh >=1."):
-                    depends[i] = dep.split(",")[0] + ",<2.0.0a0"
-
-    # Param 2.0 to be released in October 2023 with breaking changes that make
-    # incompatible many old versions of the HoloViz packages. Pinning them
-    # all to <2.0.0a0.
-    # Package name to the last version not pinning Param (either >2 or <2)
-    # correctly.
-    _holoviz_version_mapping = dict(
-        panel='1.2.3',
-        holoviews='1.17.1',
-        hvplot='0.8.4',
-        datashader='0.15.2',
-        geoviews='1.10.1',
-    )
-    if name in _holoviz_version_mapping:
-        for _holoviz_pkg, _holoviz_version in _holoviz_version_mapping.items():
-            if name != _holoviz_pkg:
-                continue
-            if VersionOrder(version) > VersionOrder(_holoviz_version):
-                continue
-            for i, dep in enumerate(depends):
-                if not dep.startswith("param"):
-                    continue
-                if "<2" in dep:
-                    continue
-                if "," not in dep:
-                    if "<=2" in dep or "<=3" in dep:
-                        # e.g. param <=2 or param <=3
-                        depends[i] = dep.split("<=")[0] + "<2.0.0a0"
-                    elif "<" in dep:
-                        # e.g. param <3
-                        depends[i] = dep.split("<")[0] + "<2.0.0a0"
-                    elif ">" not in dep:
-                        # e.g. param
-                        depends[i] = dep + " <2.0.0a0"
-                    elif ">" in dep:
-                        # e.g. param >1 or param >=1
-                        depends[i] = dep + ",<2.0.0a0"
-                else:
-                    # e.g. param >1,<3
-                    depends[i] = dep.split(",")[0] + ",<2.0.0a0"
-
-    # distributed requires `dask-core`, not `dask`. This requirement also
-    # became much stricter with the upstream 2021.5.0 release.
-    # see how it was fixed for 2021.5.1:
-    #   https://github.com/AnacondaRecipes/distributed-feedstock/blob/master/recipe/meta.yaml
-    if name == "distributed":
-        if version == "2021.5.0":
-            replace_dep(depends, "dask >=2021.04.0", "dask-core 2021.5.0.*")
-        if version == "2021.4.1":
-            replace_dep(depends, "dask >=2021.3.0", "dask-core >=2021.3.0")
-
-    # aiobotocore 1.2.2 needs botocore >=1.19.52,<1.19.53
-    if name == "aiobotocore" and version.startswith("1.2."):
-        replace_dep(depends, "botocore", "botocore >=1.19.52,<1.19.53")
-
-    # pyjwt 2.1.0 has incorrect depends/constrains on cryptography
-    if name == "pyjwt" and version == "2.1.0":
-        depends[:] = list(d for d in depends if not d.startswith("cryptography "))
-        record["constrains"] = ["cryptography >=3.3.1,<4.0.0"]
-
-    if name == "pyerfa" and version == "2.0.0":
-        replace_dep(depends, "numpy >=1.17", "numpy >=1.20.2,<2.0a0")
-
-    # Possible bug in conda solver, wherein run constrains seem to completely
-    # override version requirements in `depends`.  This results in users being
-    # able to (e.g.) install the Py3.9 build in Py3.7 or Py3.8 environments.
-    if name == "pandas" and version == "1.3.0":
-        constrains.clear()
+        replace_dep(pkg.depends, "jinja2 >=2.10.1", "jinja2 >=2.10.1,<3.0")
+        replace_dep(pkg.depends, "jinja2 >=2.10", "jinja2 >=2.10,<3.0")
+        replace_dep(pkg.depends, "werkzeug >=0.14", "werkzeug >=0.15,<2.0")
+
+
+# package found the freetype library in the build enviroment rather than
+# host but used the host run_export: freetype >=2.9.1,<3.0a0
+@_hotfix("harfbuzz")
+def _fix_harfbuzz(pkg):
+    if pkg.subdir == "osx-64" and pkg.fn == "harfbuzz-2.4.0-h831d699_0.tar.bz2":
+        replace_dep(pkg.depends, "freetype >=2.9.1,<3.0a0", "freetype >=2.10.2,<3.0a0")
+
+
+# sympy 1.6 and 1.6.1 are missing fastcache and gmpy2 depends
+@_hotfix("sympy")
+def _fix_sympy(pkg):
+    if pkg.version in ["1.6", "1.6.1"]:
+        pkg.depends.append("fastcache")
+        pkg.depends.append("gmpy2 >=2.0.8")
+
+
+@_hotfix("pytest-openfiles")
+def _fix_pytest_openfiles(pkg):
+    if pkg.version == "0.5.0":
+        pkg.depends[:] = ["psutil", "pytest >=4.6", "python >=3.6"]
+
+
+@_hotfix("pytest-doctestplus")
+def _fix_pytest_doctestplus(pkg):
+    if pkg.version == "0.7.0":
+        pkg.depends[:] = ["numpy >=1.10", "pytest >=4.0", "python >=3.6"]
+
+
+# astropy 4.2 bumped the minimum version of numpy required; the recipe was
+# updated to reflect this, but older 4.2 build need their metadata patched.
+@_hotfix("astropy")
+def _fix_astropy(pkg):
+    if pkg.version == "4.2":
+        pkg.depends[:] = [d for d in pkg.depends if not d.startswith("numpy ")]
+        pkg.depends.append("numpy >=1.17.0,<2.0a0")
+        pkg.depends.sort()
+
+
+# some builds of gitpyhon 3.1.17 list the wrong dependencies
+@_hotfix("gitpython")
+def _fix_gitpython(pkg):
+    if pkg.version in ("3.1.17", "3.1.18"):
+        pkg.depends[:] = ["gitdb >=4.0.1,<5", "python >=3.5", "typing-extensions >=3.7.4.0"]
+
+
+# click >=8.0 is actually Python 3.6+
+@_hotfix("click")
+def _fix_click(pkg):
+    if int(pkg.version.partition(".")[0]) >= 8:
+        replace_dep(pkg.depends, "python", "python >=3.6")
+
+
+# click-repl <0.2.0 incompatible with click >=8.0
+# See: https://github.com/click-contrib/click-repl/pull/76
+@_hotfix("click-repl")
+def _fix_click_repl(pkg):
+    if pkg.version.startswith("0.1."):
+        replace_dep(pkg.depends, "click", "click <8.0")
+
+
+# tifffile 2021.3.31 requires Python >=3.7, imagecodecs >=2021.3.31
+@_hotfix("tifffile")
+def _fix_tifffile(pkg):
+    if pkg.version == "2021.3.31":
+        replace_dep(pkg.depends, "python >=3.6", "python >=3.7")
+        replace_dep(pkg.depends, "imagecodecs", "imagecodecs >=2021.3.31")
+
+
+# Panel<0.11.0 requires Bokeh<2.3
+@_hotfix("panel")
+def _fix_panel_bokeh(pkg):
+    ver_parts = pkg.version.split(".")
+    if int(ver_parts[0]) == 0 and int(ver_parts[1]) < 11:
+        for i, dep in enumerate(pkg.depends):
+            if dep.startswith("bokeh >=2."):
+                pkg.depends[i] = dep.partition(",")[0] + ",<2.3"
+            elif dep.startswith("bokeh >=1."):
+                pkg.depends[i] = dep.partition(",")[0] + ",<2.0.0a0"
+
+
+# Param 2.0 to be released in October 2023 with breaking changes that make
+# incompatible many old versions of the HoloViz packages. Pinning them
+# all to <2.0.0a0.
+# Package name to the last version not pinning Param (either >2 or <2)
+# correctly.
+_holoviz_version_mapping = dict(
+    panel=_vo('1.2.3'),
+    holoviews=_vo('1.17.1'),
+    hvplot=_vo('0.8.4'),
+    datashader=_vo('0.15.2'),
+    geoviews=_vo('1.10.1'),
+)
+
+
+_PARAM_LT_2 = "<2.0.0a0"
+_PARAM_SPACE_LT_2 = " " + _PARAM_LT_2
+_PARAM_COMMA_LT_2 = "," + _PARAM_LT_2
+
+
+# the same few param specs repeat across the HoloViz records, cache them
+@functools.lru_cache(maxsize=None)
+def _cap_param_dep(dep):
+    if "<2" in dep:
+        return dep
+    if "," not in dep:
+        if "<=2" in dep or "<=3" in dep:
+            # e.g. param <=2 or param <=3
+            return dep.partition("<=")[0] + _PARAM_LT_2
+        elif "<" in dep:
+            # e.g. param <3
+            return dep.partition("<")[0] + _PARAM_LT_2
+        elif ">" not in dep:
+            # e.g. param
+            return dep + _PARAM_SPACE_LT_2
+        else:
+            # e.g. param >1 or param >=1
+            return dep + _PARAM_COMMA_LT_2
+    # e.g. param >1,<3
+    return dep.partition(",")[0] + _PARAM_COMMA_LT_2
+
+
+@_hotfix(*_holoviz_version_mapping)
+def _fix_holoviz_param(pkg):
+    if pkg.version_order > _holoviz_version_mapping[pkg.name]:
+        return
+    for i, dep in enumerate(pkg.depends):
+        if dep.startswith("param"):
+            pkg.depends[i] = _cap_param_dep(dep)
+
+
+# distributed requires `dask-core`, not `dask`. This requirement also
+# became much stricter with the upstream 2021.5.0 release.
+# see how it was fixed for 2021.5.1:
+#   https://github.com/AnacondaRecipes/distributed-feedstock/blob/master/recipe/meta.yaml
+@_hotfix("distributed")
+def _fix_distributed(pkg):
+    version = pkg.version
+    if version == "2021.5.0":
+        replace_dep(pkg.depends, "dask >=2021.04.0", "dask-core 2021.5.0.*")
+    if version == "2021.4.1":
+        replace_dep(pkg.depends, "dask >=2021.3.0", "dask-core >=2021.3.0")
+
+
+# aiobotocore 1.2.2 needs botocore >=1.19.52,<1.19.53
+@_hotfix("aiobotocore")
+def _fix_aiobotocore(pkg):
+    if pkg.version.startswith("1.2."):
+        replace_dep(pkg.depends, "botocore", "botocore >=1.19.52,<1.19.53")
+
+
+# pyjwt 2.1.0 has incorrect depends/constrains on cryptography
+@_hotfix("pyjwt")
+def _fix_pyjwt(pkg):
+    if pkg.version == "2.1.0":
+        pkg.depends[:] = [d for d in pkg.depends if not d.startswith("cryptography ")]
+        pkg.record["constrains"] = ["cryptography >=3.3.1,<4.0.0"]
+
+
+@_hotfix("pyerfa")
+def _fix_pyerfa(pkg):
+    if pkg.version == "2.0.0":
+        replace_dep(pkg.depends, "numpy >=1.17", "numpy >=1.20.2,<2.0a0")
+
+
+# Possible bug in conda solver, wherein run constrains seem to completely
+# override version requirements in `depends`.  This results in users being
+# able to (e.g.) install the Py3.9 build in Py3.7 or Py3.8 environments.
+@_hotfix("pandas")
+def _fix_pandas(pkg):
+    if pkg.version == "1.3.0":
+        pkg.constrains.clear()
         # Still to set lower bound on compatible Py3.7 interpreters
-        if record["build"].startswith("py37"):
-            for i, dep in enumerate(depends):
+        if pkg.build.startswith("py37"):
+            for i, dep in enumerate(pkg.depends):
                 if dep.startswith("python "):
-                    depends[i] = "python >=3.7.1,<3.8.0a0"
+                    pkg.depends[i] = "python >=3.7.1,<3.8.0a0"
+
+
+def _replace_constraint(constrains, prefix, constraint):
+    # drop every constraint starting with prefix and add the new one in their place
+    constrains[:] = [dep for dep in constrains if not dep.startswith(prefix)]
+    constrains.append(constraint)
 
-    if name == "conda" and version in ("22.11.0", "22.11.1"):
+
+@_hotfix("conda")
+def _fix_conda_plugins(pkg):
+    version = pkg.version
+    if version in ("22.11.0", "22.11.1"):
         # exclude all pre-plugin-system libmambapy/conda-libmamba-solver
-        constrains[:] = [
-            dep
-            for dep in constrains
-            if not dep.startswith("conda-libmamba-solver")
-        ] + ["conda-libmamba-solver >=22.12.0"]
+        _replace_constraint(pkg.constrains, "conda-libmamba-solver", "conda-libmamba-solver >=22.12.0")
         replace_dep(
-            depends, "ruamel.yaml >=0.11.14,<0.17", "ruamel.yaml >=0.11.14,<0.18"
+            pkg.depends, "ruamel.yaml >=0.11.14,<0.17", "ruamel.yaml >=0.11.14,<0.18"
         )
+    elif version == "23.9.0":
+        _replace_constraint(pkg.constrains, "conda-build ", "conda-build >=3.27")
 
-    if name == "conda" and version == "23.9.0":
-        constrains[:] = [
-            dep
-            for dep in constrains
-            if not dep.startswith("conda-build ")
-        ] + ["conda-build >=3.27"]
-
-    # Add run constraint for conda to fix plugin here:
-    # https://github.com/anaconda/conda-anaconda-telemetry/issues/87
-    # https://github.com/anaconda/conda-anaconda-telemetry/pull/96
-    if name in ("conda", "conda-build") and VersionOrder(version) >= VersionOrder("24.11.0"):
-        constrains[:] = [
-            dep
-            for dep in constrains
-            if not dep.startswith("conda-anaconda-telemetry ")
-        ] + ["conda-anaconda-telemetry >=0.1.2"]
-
-    if name == "conda-libmamba-solver":
-        # libmambapy 0.23 introduced breaking changes
-        replace_dep(depends, "libmambapy >=0.22.1", "libmambapy 0.22.*")
-        if version == "22.6.0":
-            # conda 4.13 needed for the user agent strings
-            replace_dep(depends, "conda >=4.12", "conda >=4.13")
-        # conda 22.11 introduces the plugin system
-        replace_dep(depends, "conda >=4.13", "conda >=4.13,<22.11.0a")
-        # conda 23.1 changed an internal SubdirData API needed for S3/FTP channels
-        if VersionOrder(version) < VersionOrder("23.1.0a0"):
-            # https://github.com/conda/conda-libmamba-solver/issues/132
-            replace_dep(depends, "conda >=22.11.0", "conda >=22.11.0,<23.1.0a")
-        # conda 23.3 changed an internal SubdirData API needed with S3/FTP channels
-        # conda deprecated Boltons leading to a breakage in the solver api interface
-        if VersionOrder(version) < VersionOrder("23.2.0a0"):
-            # https://github.com/conda/conda-libmamba-solver/issues/153
-            # https://github.com/conda/conda-libmamba-solver/issues/152
-            replace_dep(depends, "conda >=22.11.0", "conda >=22.11.0,<23.2.0a")
-        if VersionOrder(version) < VersionOrder("24.7.0a0"):
-            # https://github.com/conda/conda-libmamba-solver/pull/492
-            replace_dep(depends, "libmambapy >=1.5.6", "libmambapy >=1.5.6,<2.0.0a0")
-            replace_dep(depends, "libmambapy >=1.5.3", "libmambapy >=1.5.3,<2.0.0a0")
-            replace_dep(depends, "libmambapy >=1.5.1", "libmambapy >=1.5.1,<2.0.0a0")
-            replace_dep(depends, "libmambapy >=1.4.1", "libmambapy >=1.4.1,<2.0.0a0")
-            replace_dep(depends, "libmambapy >=1.0.0", "libmambapy >=1.0.0,<2.0.0a0")
-            replace_dep(depends, "libmambapy >=0.23", "libmambapy >=0.23,<2.0.0a0")
-            replace_dep(depends, "libmambapy >=0.22.1", "libmambapy >=0.22.1,<2.0.0a0")
-
-    if name == "conda-token" and VersionOrder(version) < VersionOrder("0.5.0"):
-        replace_dep(depends, "conda >=4.3", "conda >=4.3,<23.9")
-
-    # snowflake-snowpark-python cloudpickle pins
-    if name == "snowflake-snowpark-python" and version == '0.6.0':
-        replace_dep(depends, 'cloudpickle >=1.6.0', 'cloudpickle >=1.6.0,<=2.0.0')
-
-    # s3fs downgraded to the last version not requiring botocore.
-    # ref dask/dask#10397
-    if name == "s3fs" and VersionOrder(version) <= VersionOrder("0.4.2"):
-        replace_dep(depends, "python", "python <3.9")
-        replace_dep(depends, "python >=3.5", "python >=3.5,<3.9")
-        replace_dep(depends, "python >=3.6", "python >=3.6,<3.9")
-
-    # This targets an errant version on the osx-arm64 subdir
-    # REMOVE after ffmpeg is updated from 4.2.2.
-    if name == "ffmpeg" and version == "4.2.2":
-        depends[:] = [d for d in depends if not d.startswith("openssl")]
-
-    # anaconda-ident<0.2 not compatible with anaconda-anon-usage
-    # anaconda-anon-usage<0.4 not compatible with anaconda-ident
-    if name == "anaconda-ident" and VersionOrder(version) < VersionOrder("0.2"):
-        record["constrains"] = ["anaconda-anon-usage <0"]
-    if name == "anaconda-anon-usage" and VersionOrder(version) < VersionOrder("0.4"):
-        record["constrains"] = ["anaconda-ident <0"]
-
-    # orange3 pandas 2.1 error
-    if name == "orange3" and VersionOrder(version) < VersionOrder("3.36.0"):
-        replace_dep(depends, "pandas", "pandas >=1.3.0,<2")
-        replace_dep(depends, "pandas >=1.3.0", "pandas >=1.3.0,<2")
-        replace_dep(depends, "pandas >=1.3.0,!=1.5.0", "pandas >=1.3.0,!=1.5.0,<2")
-
-    # ray-core needs async-timeout
-    if name == "ray-core" and VersionOrder(version) < VersionOrder("2.6.4"):
-        if not any(_.startswith("async-timeout") for _ in depends):
-            depends.append("async-timeout")
-
-    # poppler 24.09.0 incompatibility
-    if (name == "graphviz" and VersionOrder(version) < VersionOrder("2.50.0") or
-            (version == "2.50.0" and build_number < 2)):
-        replace_dep(depends, "poppler", "poppler <=22.12.0")
-    if (name in ["libgdal", "libgdal-arrow-parquet"] and VersionOrder(version) < VersionOrder("3.6.2") or
-            (version == "3.6.2" and build_number < 7)):
-        replace_dep(depends, "poppler", "poppler <=22.12.0")
-    if (name == "python-poppler" and VersionOrder(version) < VersionOrder("0.4.1") or
-            (version == "0.4.1" and build_number < 1)):
-        replace_dep(depends, "poppler", "poppler <=22.12.0")
-    if (name == "r-pdftools" and VersionOrder(version) < VersionOrder("3.4.0") or
-            (version == "3.4.0" and build_number < 1)):
-        replace_dep(depends, "poppler", "poppler <=22.12.0")
-
-    # libarchive 3.7.5 abi breaking change - https://github.com/libarchive/libarchive/pull/1976
-    if (name == "libmamba" and VersionOrder(version) >= VersionOrder("1.5.8") and
-            VersionOrder(version) <= VersionOrder("1.5.11")):
-        replace_dep(depends, "libarchive >=3.7.4,<3.8.0a0", "libarchive >=3.7.4,<3.7.5.0a0")
-    if name == "tesseract" and version == "5.2.0":
-        replace_dep(depends, "libarchive >=3.7.4,<3.8.0a0", "libarchive >=3.7.4,<3.7.5.0a0")
-
-    ###########################
-    # compilers and run times #
-    ###########################
-
-    if subdir.startswith("linux-"):
-        _fix_linux_runtime_bounds(depends)
-
-    if subdir == "osx-64":
-        replace_dep(depends, "libgfortran >=3.0.1", "libgfortran >=3.0.1,<4.0.0.a0")
-
-    # loosen binutils_impl dependency on gcc_impl_ packages
-    if name.startswith("gcc_impl_"):
-        for i, dep in enumerate(depends):
-            if dep.startswith("binutils_impl_"):
-                dep_parts = dep.split()
-                if len(dep_parts) == 3:
-                    correct_dep = "{} >={},<3".format(*dep_parts[:2])
-                    depends[i] = correct_dep
-
-    # Add mutex package for libgcc-ng
-    if name == "libgcc-ng":
-        depends.append("_libgcc_mutex * main")
-
-    # Limit breaks as we transition from CentOS 6 to 7
-    if (
-        subdir == "linux-64"
-        and name in ("libgcc-ng", "libstdcxx-ng", "libgfortran-ng")
-        and version in ("7.5.0", "8.4.0", "9.3.0", "11.2.0")
-    ):
+
+_VO_24_11_0 = _vo("24.11.0")
+
+
+# Add run constraint for conda to fix plugin here:
+# https://github.com/anaconda/conda-anaconda-telemetry/issues/87
+# https://github.com/anaconda/conda-anaconda-telemetry/pull/96
+@_hotfix("conda", "conda-build")
+def _fix_conda_telemetry(pkg):
+    if pkg.version_order >= _VO_24_11_0:
+        _replace_constraint(pkg.constrains, "conda-anaconda-telemetry ", "conda-anaconda-telemetry >=0.1.2")
+
+
+_VO_23_1_0A0 = _vo("23.1.0a0")
+_VO_23_2_0A0 = _vo("23.2.0a0")
+_VO_24_7_0A0 = _vo("24.7.0a0")
+_LIBMAMBAPY_LT_2_PINS = {
+    "libmambapy >=1.5.6": "libmambapy >=1.5.6,<2.0.0a0",
+    "libmambapy >=1.5.3": "libmambapy >=1.5.3,<2.0.0a0",
+    "libmambapy >=1.5.1": "libmambapy >=1.5.1,<2.0.0a0",
+    "libmambapy >=1.4.1": "libmambapy >=1.4.1,<2.0.0a0",
+    "libmambapy >=1.0.0": "libmambapy >=1.0.0,<2.0.0a0",
+    "libmambapy >=0.23": "libmambapy >=0.23,<2.0.0a0",
+    "libmambapy >=0.22.1": "libmambapy >=0.22.1,<2.0.0a0",
+}
+
+
+@_hotfix("conda-libmamba-solver")
+def _fix_conda_libmamba_solver(pkg):
+    version = pkg.version
+    # libmambapy 0.23 introduced breaking changes
+    replace_dep(pkg.depends, "libmambapy >=0.22.1", "libmambapy 0.22.*")
+    if version == "22.6.0":
+        # conda 4.13 needed for the user agent strings
+        replace_dep(pkg.depends, "conda >=4.12", "conda >=4.13")
+    # conda 22.11 introduces the plugin system
+    replace_dep(pkg.depends, "conda >=4.13", "conda >=4.13,<22.11.0a")
+    # conda 23.1 changed an internal SubdirData API needed for S3/FTP channels
+    if pkg.version_order < _VO_23_1_0A0:
+        # https://github.com/conda/conda-libmamba-solver/issues/132
+        replace_dep(pkg.depends, "conda >=22.11.0", "conda >=22.11.0,<23.1.0a")
+    # conda 23.3 changed an internal SubdirData API needed with S3/FTP channels
+    # conda deprecated Boltons leading to a breakage in the solver api interface
+    if pkg.version_order < _VO_23_2_0A0:
+        # https://github.com/conda/conda-libmamba-solver/issues/153
+        # https://github.com/conda/conda-libmamba-solver/issues/152
+        replace_dep(pkg.depends, "conda >=22.11.0", "conda >=22.11.0,<23.2.0a")
+    if pkg.version_order < _VO_24_7_0A0:
+        # https://github.com/conda/conda-libmamba-solver/pull/492
+        replace_deps(pkg.depends, _LIBMAMBAPY_LT_2_PINS)
+
+
+_VO_0_5_0 = _vo("0.5.0")
+
+
+@_hotfix("conda-token")
+def _fix_conda_token(pkg):
+    if pkg.version_order < _VO_0_5_0:
+        replace_dep(pkg.depends, "conda >=4.3", "conda >=4.3,<23.9")
+
+
+# snowflake-snowpark-python cloudpickle pins
+@_hotfix("snowflake-snowpark-python")
+def _fix_snowflake_snowpark_python(pkg):
+    if pkg.version == '0.6.0':
+        replace_dep(pkg.depends, 'cloudpickle >=1.6.0', 'cloudpickle >=1.6.0,<=2.0.0')
+
+
+_VO_0_4_2 = _vo("0.4.2")
+_S3FS_PYTHON_PINS = {
+    "python": "python <3.9",
+    "python >=3.5": "python >=3.5,<3.9",
+    "python >=3.6": "python >=3.6,<3.9",
+}
+
+
+# s3fs downgraded to the last version not requiring botocore.
+# ref dask/dask#10397
+@_hotfix("s3fs")
+def _fix_s3fs(pkg):
+    if pkg.version_order <= _VO_0_4_2:
+        replace_deps(pkg.depends, _S3FS_PYTHON_PINS)
+
+
+# This targets an errant version on the osx-arm64 subdir
+# REMOVE after ffmpeg is updated from 4.2.2.
+@_hotfix("ffmpeg")
+def _fix_ffmpeg(pkg):
+    if pkg.version == "4.2.2":
+        pkg.depends[:] = [d for d in pkg.depends if not d.startswith("openssl")]
+
+
+_VO_0_2 = _vo("0.2")
+
+
+# anaconda-ident<0.2 not compatible with anaconda-anon-usage
+# anaconda-anon-usage<0.4 not compatible with anaconda-ident
+@_hotfix("anaconda-ident")
+def _fix_anaconda_ident(pkg):
+    if pkg.version_order < _VO_0_2:
+        pkg.record["constrains"] = ["anaconda-anon-usage <0"]
+
+
+_VO_0_4 = _vo("0.4")
+
+
+@_hotfix("anaconda-anon-usage")
+def _fix_anaconda_anon_usage(pkg):
+    if pkg.version_order < _VO_0_4:
+        pkg.record["constrains"] = ["anaconda-ident <0"]
+
+
+_VO_3_36_0 = _vo("3.36.0")
+_ORANGE3_PANDAS_PINS = {
+    "pandas": "pandas >=1.3.0,<2",
+    "pandas >=1.3.0": "pandas >=1.3.0,<2",
+    "pandas >=1.3.0,!=1.5.0": "pandas >=1.3.0,!=1.5.0,<2",
+}
+
+
+# orange3 pandas 2.1 error
+@_hotfix("orange3")
+def _fix_orange3(pkg):
+    if pkg.version_order < _VO_3_36_0:
+        replace_deps(pkg.depends, _ORANGE3_PANDAS_PINS)
+
+
+_VO_2_6_4 = _vo("2.6.4")
+
+
+# ray-core needs async-timeout
+@_hotfix("ray-core")
+def _fix_ray_core(pkg):
+    if pkg.version_order < _VO_2_6_4:
+        if not any(_.startswith("async-timeout") for _ in pkg.depends):
+            pkg.depends.append("async-timeout")
+
+
+# poppler 24.09.0 incompatibility: packages older than the cutoff version,
+# and builds of the cutoff version itself below the given build number, are
+# limited to poppler <=22.12.0
+_POPPLER_NAME_CUTOFFS = {
+    "graphviz": _vo("2.50.0"),
+    "libgdal": _vo("3.6.2"),
+    "libgdal-arrow-parquet": _vo("3.6.2"),
+    "python-poppler": _vo("0.4.1"),
+    "r-pdftools": _vo("3.4.0"),
+}
+# the build number fallbacks are not scoped to the package name, so this has
+# to run for every record
+_POPPLER_BUILD_CUTOFFS = {
+    "2.50.0": 2,
+    "3.6.2": 7,
+    "0.4.1": 1,
+    "3.4.0": 1,
+}
+
+
+@_hotfix()
+def _fix_poppler(pkg):
+    # a record is never both older than its name's cutoff and at that cutoff
+    # version, so these are the same rules applied once each
+    cutoff = _POPPLER_NAME_CUTOFFS.get(pkg.name)
+    if cutoff is not None and pkg.version_order < cutoff:
+        replace_dep(pkg.depends, "poppler", "poppler <=22.12.0")
+    build_cutoff = _POPPLER_BUILD_CUTOFFS.get(pkg.version)
+    if build_cutoff is not None and pkg.build_number < build_cutoff:
+        replace_dep(pkg.depends, "poppler", "poppler <=22.12.0")
+
+
+_VO_1_5_8 = _vo("1.5.8")
+_VO_1_5_11 = _vo("1.5.11")
+
+
+# libarchive 3.7.5 abi breaking change - https://github.com/libarchive/libarchive/pull/1976
+@_hotfix("libmamba")
+def _fix_libmamba(pkg):
+    if (pkg.version_order >= _VO_1_5_8 and
+            pkg.version_order <= _VO_1_5_11):
+        replace_dep(pkg.depends, "libarchive >=3.7.4,<3.8.0a0", "libarchive >=3.7.4,<3.7.5.0a0")
+
+
+@_hotfix("tesseract")
+def _fix_tesseract(pkg):
+    if pkg.version == "5.2.0":
+        replace_dep(pkg.depends, "libarchive >=3.7.4,<3.8.0a0", "libarchive >=3.7.4,<3.7.5.0a0")
+
+
+###########################
+# compilers and run times #
+###########################
+
+@_hotfix(subdirs=("linux-",))
+def _fix_linux_runtimes(pkg):
+    _fix_linux_runtime_bounds(pkg.depends)
+
+
+@_hotfix(subdirs=("osx-64",))
+def _fix_osx_runtimes(pkg):
+    replace_dep(pkg.depends, "libgfortran >=3.0.1", "libgfortran >=3.0.1,<4.0.0.a0")
+
+
+# loosen binutils_impl dependency on gcc_impl_ packages
+@_hotfix(prefix="gcc_impl_")
+def _fix_gcc_impl_binutils(pkg):
+    for i, dep in enumerate(pkg.depends):
+        if dep.startswith("binutils_impl_"):
+            dep_parts = dep.split()
+            if len(dep_parts) == 3:
+                correct_dep = "{} >={},<3".format(*dep_parts[:2])
+                pkg.depends[i] = correct_dep
+
+
+# Add mutex package for libgcc-ng
+@_hotfix("libgcc-ng")
+def _fix_libgcc_mutex(pkg):
+    pkg.depends.append("_libgcc_mutex * main")
+
+
+# Limit breaks as we transition from CentOS 6 to 7
+@_hotfix("libgcc-ng", "libstdcxx-ng", "libgfortran-ng")
+def _fix_linux_runtime_glibc(pkg):
+    if pkg.subdir == "linux-64" and pkg.version in ("7.5.0", "8.4.0", "9.3.0", "11.2.0"):
         # This would probably be better as a `constrains`, but conda's solver
         # currently has issues enforcing virtual package constrains. Making
         # `__glibc` a hard `depends` will almost surely break building
         # cross-platform environments (e.g., via setting `$CONDA_SUBDIR`).
-        depends.append("__glibc >=2.17")
+        pkg.depends.append("__glibc >=2.17")
+
+
+# fix clang_osx-64 and clangcxx_osx-64 packages to include dependencies, see:
+# https://github.com/AnacondaRecipes/aggregate/pull/164
+@_hotfix("clang_osx-64")
+def _fix_clang_osx_64(pkg):
+    if pkg.subdir == "osx-64" and pkg.version == "4.0.1" and int(pkg.build_number) < 17:
+        pkg.depends[:] = ["cctools", "clang 4.0.1.*", "compiler-rt 4.0.1.*", "ld64"]
+
 
-    if subdir == "osx-64":
-        # fix clang_osx-64 and clangcxx_osx-64 packages to include dependencies, see:
-        # https://github.com/AnacondaRecipes/aggregate/pull/164
-        if name == "clang_osx-64" and version == "4.0.1" and int(build_number) < 17:
-            depends[:] = ["cctools", "clang 4.0.1.*", "compiler-rt 4.0.1.*", "ld64"]
-        if name == "clangxx_osx-64" and version == "4.0.1" and int(build_number) < 17:
-            depends[:] = ["clang_osx-64 >=4.0.1,<4.0.2.0a0", "clangxx", "libcxx"]
+@_hotfix("clangxx_osx-64")
+def _fix_clangxx_osx_64(pkg):
+    if pkg.subdir == "osx-64" and pkg.version == "4.0.1" and int(pkg.build_number) < 17:
+        pkg.depends[:] = ["clang_osx-64 >=4.0.1,<4.0.2.0a0", "clangxx", "libcxx"]
 
-    ###########
-    # numpy 2 #
-    ###########
 
-    # Numpy 2.0.0 Patch
+###########
+# numpy 2 #
+###########
 
-    # Numpy 2.0.0 hotfix will allow a bulk of packages to be locked to below 2.0.0 as the interoperability
-    # between numpy 1.x and 2.x is not guaranteed.
+# Numpy 2.0.0 Patch
 
-    # This will ensure upper bounds on numpy for all packages that are not confirmed to be compatible with numpy 2.0.0
+# Numpy 2.0.0 hotfix will allow a bulk of packages to be locked to below 2.0.0 as the interoperability
+# between numpy 1.x and 2.x is not guaranteed.
+
+# This will ensure upper bounds on numpy for all packages that are not confirmed to be compatible with numpy 2.0.0
+@_hotfix()
+def _fix_numpy2(pkg):
     if NUMPY_2_CHANGES:
-        apply_numpy2_changes(record, subdir, fn)
+        apply_numpy2_changes(pkg.record, pkg.subdir, pkg.fn)
 
 
 def replace_dep(depends, old, new, *, append=False):
@@ -1579,16 +2210,24 @@ def replace_dep(depends, old, new, *, append=False):
 
     :rtype: Literal['+', '-', '~', '=']
     """
-    if isinstance(old, str):
-        old = [old]
     if append and (new is None):
         raise TypeError('Forbidden to append None to dependencies')
-
     removed = False
-    for item in old:
-        if item in depends:
-            depends.remove(item)
+    if isinstance(old, str):
+        # most calls are for a single dependency, which the record usually doesn't have
+        try:
+            depends.remove(old)
             removed = True
+        except ValueError:
+            if not append:
+                return '='
+    else:
+        for item in old:
+            try:
+                depends.remove(item)
+                removed = True
+            except ValueError:
+                pass
 
     if (removed or append) and (new is not None) and (new not in depends):
         bisect.insort_left(depends, new)
@@ -1600,68 +2239,93 @@ def replace_dep(depends, old, new, *, append=False):
     return '='
 
 
-def _extract_and_remove_vc_feature(record):
-    features = record.get("features", "").split()
-    vc_features = tuple(f for f in features if f.startswith("vc"))
-    if not vc_features:
-        return None
-    non_vc_features = tuple(f for f in features if f not in vc_features)
-    vc_version = int(vc_features[0][2:])  # throw away all but the first
-    if non_vc_features:
-        record["features"] = " ".join(non_vc_features)
-    else:
-        del record["features"]
-    return vc_version
+def replace_deps(depends, replacements):
+    """
+    Replace several dependencies at once, see :func:`replace_dep`.
 
+    :param depends: List of dependencies that should be updated.
+    :type depends: list[str]
 
-def _extract_feature(record, feature_name):
-    features = record.get("features", "").split()
-    features.remove(feature_name)
-    return " ".join(features)
+    :param replacements: Mapping of old dependencies to the new ones replacing them, applied in order. A new
+                         dependency must not also be an old one, as the old ones are all looked up before any
+                         replacement is made.
+    :type replacements: dict[str, str | None]
+    """
+    present = set(depends)
+    for old, new in replacements.items():
+        if old in present:
+            replace_dep(depends, old, new)
+
+
+def _intern_strings(repodata):
+    # the same dependency strings are repeated across thousands of records,
+    # share one object per distinct string instead of one per record. They
+    # are interned with the interpreter, so lookups against the interned
+    # names and pins in the hotfixes succeed on identity.
+    for record in repodata["packages"].values():
+        record["name"] = sys.intern(record["name"])
+        for key in ("depends", "constrains"):
+            deps = record.get(key)
+            if deps:
+                record[key] = [sys.intern(dep) for dep in deps]
+
+
+@functools.lru_cache(maxsize=None)
+def _hotfixes_digest():
+    # everything besides the repodata that the patch instructions depend on
+    digest = hashlib.sha256(conda.__version__.encode())
+    for path in (__file__, _features.__file__, _repodata_io.__file__, json_file_path):
+        digest.update(Path(path).read_bytes())
+    return digest.digest()
+
+
+def _patch_subdir(base_dir, subdir):
+    # Step 1. Collect initial repodata for the subdir.
+    repodata_path = join(base_dir, subdir, "repodata_from_packages.json")
+    repodata_url = "/".join(
+        (CHANNEL_ALIAS, CHANNEL_NAME, subdir, "repodata_from_packages.json")
+    )
+    content = _read_or_fetch_bytes(repodata_path, repodata_url)
+
+    # the last run's patch instructions still hold if neither the repodata
+    # nor the hotfixes changed since
+    patch_instructions_path = join(base_dir, subdir, "patch_instructions.json")
+    digest_path = patch_instructions_path + ".sha256"
+    digest = hashlib.sha256(_hotfixes_digest())
+    digest.update(content)
+    digest = digest.hexdigest()
+    if isfile(patch_instructions_path) and isfile(digest_path) and Path(digest_path).read_text() == digest:
+        return
+    repodata = _loads_json(content)
+    # don't hold on to the raw bytes while patching
+    del content
 
+    # only the "packages" index is patched, let go of the rest (e.g. the
+    # "packages.conda" index) before patching
+    repodata = {"packages": repodata["packages"]}
+    _intern_strings(repodata)
 
-def _extract_track_feature(record, feature_name):
-    features = record.get("track_features", "").split()
-    features.remove(feature_name)
-    return " ".join(features)
+    # Step 2. Create the patch instructions.
+    instructions = _patch_repodata(repodata, subdir)
+    _write_json(patch_instructions_path, instructions)
+    _write_bytes(digest_path, digest.encode())
 
 
-def do_hotfixes(base_dir):
-    # Step 1. Collect initial repodata for all subdirs.
-    repodatas = {}
-    for subdir in SUBDIRS:
-        repodata_path = join(base_dir, subdir, "repodata_from_packages.json")
-        if isfile(repodata_path):
-            with open(repodata_path) as fh:
-                repodatas[subdir] = json.load(fh)
-        else:
-            repodata_url = "/".join(
-                (CHANNEL_ALIAS, CHANNEL_NAME, subdir, "repodata_from_packages.json")
-            )
-            response = requests.get(repodata_url)
-            response.raise_for_status()
-            repodatas[subdir] = response.json()
-            if not isdir(dirname(repodata_path)):
-                os.makedirs(dirname(repodata_path))
-            with open(repodata_path, "w") as fh:
-                json.dump(
-                    repodatas[subdir],
-                    fh,
-                    indent=2,
-                    sort_keys=True,
-                    separators=(",", ": "),
-                )
+def _cached_repodata_size(base_dir, subdir):
+    repodata_path = join(base_dir, subdir, "repodata_from_packages.json")
+    return os.path.getsize(repodata_path) if isfile(repodata_path) else 0
 
-    # Step 2. Create all patch instructions.
-    patch_instructions = {}
-    for subdir in SUBDIRS:
-        instructions = _patch_repodata(repodatas[subdir], subdir)
-        patch_instructions_path = join(base_dir, subdir, "patch_instructions.json")
-        with open(patch_instructions_path, "w") as fh:
-            json.dump(
-                instructions, fh, indent=2, sort_keys=True, separators=(",", ": ")
-            )
-        patch_instructions[subdir] = instructions
+
+def do_hotfixes(base_dir):
+    # subdirs are independent of each other, patch them in parallel. Start
+    # the biggest ones first so they don't end up running on their own at
+    # the end. One worker per subdir so every download can start right away,
+    # even on machines with fewer cores.
+    subdirs = sorted(SUBDIRS, key=lambda subdir: _cached_repodata_size(base_dir, subdir), reverse=True)
+    with ProcessPoolExecutor(max_workers=len(subdirs)) as executor:
+        futures = [executor.submit(_patch_subdir, base_dir, subdir) for subdir in subdirs]
+        for future in futures:
+            future.result()
 
 
 def main():
@@ -1,13 +1,15 @@
 import fnmatch
-import json
-import os
+import functools
 import re
 import sys
 from collections import defaultdict
-from os.path import dirname, isdir, isfile, join
+from concurrent.futures import ThreadPoolExecutor
+from os.path import dirname, join
 
 import requests
 
+from _repodata_io import _read_or_fetch_json, _write_json
+
 CHANNEL_NAME = "r"
 CHANNEL_ALIAS = "https://repo.anaconda.com/pkgs"
 SUBDIRS = (
@@ -134,6 +136,12 @@ def _get_record_depends(fn, record, instructions):
     return record_depends
 
 
+@functools.lru_cache(maxsize=None)
+def _glob_re(pattern):
+    # fnmatch's own cache is bounded; the set of patterns here is small and fixed
+    return re.compile(fnmatch.translate(pattern))
+
+
 def _patch_repodata(repodata, subdir):
     instructions = {
         "patch_instructions_version": 1,
@@ -230,11 +238,11 @@ def _patch_repodata(repodata, subdir):
                 record['depends'].append("_r-mutex 1.* mro_2")
             instructions["packages"][fn]["depends"] = record['depends']
 
-        if (any(fnmatch.fnmatch(fn, rev) for rev in REVOKED.get(subdir, [])) or
-                any(fnmatch.fnmatch(fn, rev) for rev in REVOKED.get("any", []))):
+        if (any(_glob_re(rev).match(fn) for rev in REVOKED.get(subdir, [])) or
+                any(_glob_re(rev).match(fn) for rev in REVOKED.get("any", []))):
             instructions['revoke'].append(fn)
-        if (any(fnmatch.fnmatch(fn, rev) for rev in REMOVALS.get(subdir, [])) or
-                any(fnmatch.fnmatch(fn, rev) for rev in REMOVALS.get("any", []))):
+        if (any(_glob_re(rev).match(fn) for rev in REMOVALS.get(subdir, [])) or
+                any(_glob_re(rev).match(fn) for rev in REMOVALS.get("any", []))):
             instructions['remove'].append(fn)
 
         if any(dep == 'mro-base' for dep in record.get('depends', [])):
@@ -274,37 +282,20 @@ def _patch_repodata(repodata, subdir):
     return instructions
 
 
-def _extract_and_remove_vc_feature(record):
-    features = record.get('features', '').split()
-    vc_features = tuple(f for f in features if f.startswith('vc'))
-    if not vc_features:
-        return None
-    non_vc_features = tuple(f for f in features if f not in vc_features)
-    vc_version = int(vc_features[0][2:])  # throw away all but the first
-    if non_vc_features:
-        record['features'] = ' '.join(non_vc_features)
-    else:
-        del record['features']
-    return vc_version
-
-
 def do_hotfixes(base_dir):
     # Step 1. Collect initial repodata for all subdirs.
-    repodatas = {}
-    for subdir in SUBDIRS:
-        repodata_path = join(base_dir, subdir, 'repodata-clone.json')
-        if isfile(repodata_path):
-            with open(repodata_path) as fh:
-                repodatas[subdir] = json.load(fh)
-        else:
-            repodata_url = "/".join((CHANNEL_ALIAS, CHANNEL_NAME, subdir, "repodata.json"))
-            response = requests.get(repodata_url)
-            response.raise_for_status()
-            repodatas[subdir] = response.json()
-            if not isdir(dirname(repodata_path)):
-                os.makedirs(dirname(repodata_path))
-            with open(repodata_path, 'w') as fh:
-                json.dump(repodatas[subdir], fh, indent=2, sort_keys=True, separators=(',', ': '))
+    # the downloads are network bound, fetch them all at once over one session
+    with requests.Session() as session, ThreadPoolExecutor(max_workers=len(SUBDIRS)) as executor:
+        futures = {
+            subdir: executor.submit(
+                _read_or_fetch_json,
+                join(base_dir, subdir, 'repodata-clone.json'),
+                "/".join((CHANNEL_ALIAS, CHANNEL_NAME, subdir, "repodata.json")),
+                session,
+            )
+            for subdir in SUBDIRS
+        }
+        repodatas = {subdir: future.result() for subdir, future in futures.items()}
 
     # Step 2. Create all patch instructions.
     patch_instructions = {}
@@ -312,8 +303,7 @@ def do_hotfixes(base_dir):
         instructions = _patch_repodata(repodatas[subdir], subdir)
 
         patch_instructions_path = join(base_dir, subdir, "patch_instructions.json")
-        with open(patch_instructions_path, 'w') as fh:
-            json.dump(instructions, fh, indent=2, sort_keys=True, separators=(',', ': '))
+        _write_json(patch_instructions_path, instructions)
         patch_instructions[subdir] = instructions
 
 
@@ -0,0 +1,47 @@
+# -*- coding: utf-8 -*-
+
+"""Tests for :func:`~main._patch_repodata`."""
+
+from __future__ import annotations
+
+__all__ = ()
+
+import pytest
+
+import main
+
+NUMPY_FN = 'numpy-1.14.5-py35h28100ab_0.tar.bz2'
+NUMPY_BASE_FN = 'numpy-base-1.14.5-py35hdbf6ddf_0.tar.bz2'
+
+
+def _index() -> dict:
+    return {
+        NUMPY_FN: {
+            'name': 'numpy',
+            'version': '1.14.5',
+            'build': 'py35h28100ab_0',
+            'build_number': 0,
+            'depends': ['numpy-base 1.14.5 py35hdbf6ddf_0', 'python >=3.5,<3.6.0a0'],
+        },
+        NUMPY_BASE_FN: {
+            'name': 'numpy-base',
+            'version': '1.14.5',
+            'build': 'py35hdbf6ddf_0',
+            'build_number': 0,
+            'depends': ['python >=3.5,<3.6.0a0'],
+        },
+    }
+
+
+@pytest.mark.parametrize('removed', [False, True])
+def test_numpy_base_constrains(monkeypatch: pytest.MonkeyPatch, removed: bool) -> None:
+    """The numpy-base of a numpy is constrained to it, even if that numpy is removed."""
+    monkeypatch.setattr(main, '_REMOVALS_PATTERNS', main._compile_table({'any': [NUMPY_FN] if removed else []}))
+    monkeypatch.setattr(main, '_REVOKED_PATTERNS', main._compile_table({}))
+
+    instructions = main._patch_repodata({'packages': _index()}, 'linux-64')
+
+    assert instructions['remove'] == ([NUMPY_FN] if removed else [])
+    assert instructions['packages'][NUMPY_BASE_FN]['constrains'] == ['numpy 1.14.5 py35h28100ab_0']
+    if removed:
+        assert NUMPY_FN not in instructions['packages']
@@ -1,6 +1,6 @@
 # -*- coding: utf-8 -*-
 
-"""Tests for :func:`~main.replace_dep`."""
+"""Tests for :func:`~main.replace_dep` and :func:`~main.replace_deps`."""
 
 from __future__ import annotations
 
@@ -10,7 +10,7 @@ import typing
 
 import pytest
 
-from main import replace_dep
+from main import replace_dep, replace_deps
 
 
 def test_fail_append_removing() -> None:
@@ -210,3 +210,23 @@ def test_replace_dep(
 
     assert replace_dep(depends, old, new, **kwargs) == expected_outcome
     assert depends == expected_dependencies
+
+
+def test_replace_deps() -> None:
+    """Check that :func:`~main.replace_deps` applies only the replacements for present dependencies."""
+    depends: list[str] = [
+        'anaconda-client >=1.11.1',
+        'attrs >=22.2.0',
+        'conda >=23.1.0',
+        'pytest >=7.2.2',
+        'zstandard >=0.20.0',
+    ]
+
+    replace_deps(depends, {
+        'attrs >=22.2.0': 'attrs >=22.2.0,<23',
+        'flask >=2.2.3': 'flask >=2.2.3,<3',
+        'pytest >=7.2.2': None,
+    })
+    assert depends == [
+        'anaconda-client >=1.11.1', 'attrs >=22.2.0,<23', 'conda >=23.1.0', 'zstandard >=0.20.0',
+    ]